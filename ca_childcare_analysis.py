@@ -1,7 +1,13 @@
+import os
+import re
+import shutil
+import time
 import requests
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -11,6 +17,25 @@ DATA_URLS = {
     'family_child_care_homes': 'https://data.chhs.ca.gov/dataset/46ffcbdf-4874-4cc1-92c2-fb715e3ad014/resource/4b5cc48d-03b1-4f42-a7d1-b9816903eb2b/download/tmpghf_prqt.csv'
 }
 
+# Columns read from the CHHS CSVs, with explicit dtypes so read_csv skips type
+# inference. facility_type is re-assigned per dataset, and the state, regional
+# office and file date columns are never used, so they are not parsed at all.
+FACILITY_DTYPES = {
+    'facility_number': 'Int64',
+    'facility_name': str,
+    'licensee': str,
+    'facility_administrator': str,
+    'facility_telephone_number': str,
+    'facility_address': str,
+    'facility_city': str,
+    'facility_zip': str,
+    'county_name': str,
+    'facility_capacity': 'Int32',
+    'facility_status': str,
+    'license_first_date': str,
+    'closed_date': str,
+}
+
 # List of all 58 California counties
 CA_COUNTIES = [
     'Alameda', 'Alpine', 'Amador', 'Butte', 'Calaveras', 'Colusa', 'Contra Costa', 'Del Norte',
@@ -23,29 +48,125 @@ CA_COUNTIES = [
     'Tulare', 'Tuolumne', 'Ventura', 'Yolo', 'Yuba'
 ]
 
+# Fraud flags as (label, score weight). Each facility's flags are tracked as a
+# bitmask over this tuple; scores and flag strings are rendered by lookup.
+FRAUD_FLAGS = (
+    ('DUPLICATE_ADDRESS', 2),
+    ('HIGH_VOLUME_LICENSEE', 1),
+    ('COVID_ERA_LICENSE', 1),
+    ('SHORT_LIVED', 2),
+)
+FLAG_DUPLICATE_ADDRESS, FLAG_HIGH_VOLUME_LICENSEE, FLAG_COVID_ERA_LICENSE, FLAG_SHORT_LIVED = (
+    1 << bit for bit in range(len(FRAUD_FLAGS))
+)
+FRAUD_FLAG_SCORES = np.array([
+    sum(weight for bit, (_, weight) in enumerate(FRAUD_FLAGS) if bits >> bit & 1)
+    for bits in range(1 << len(FRAUD_FLAGS))
+])
+FRAUD_FLAG_STRINGS = np.array([
+    ''.join(f'{label}; ' for bit, (label, _) in enumerate(FRAUD_FLAGS) if bits >> bit & 1)
+    for bits in range(1 << len(FRAUD_FLAGS))
+], dtype=object)
+
+# Address normalization patterns, compiled once and reused for every column pass
+ADDRESS_PUNCT_RE = re.compile(r'[.,]')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Re-use the local Parquet copy of each dataset for this long before re-downloading
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+
+def save_output(df, name):
+    """Save an analysis output as zstd Parquet (CSV without pyarrow) and return the filename."""
+    try:
+        filename = f"{name}.parquet"
+        df.to_parquet(filename, compression='zstd', index=False)
+    except ImportError:
+        filename = f"{name}.csv"
+        df.to_csv(filename, index=False)
+    return filename
+
+
+def read_facility_csv(filename):
+    """Read the FACILITY_DTYPES columns of a CHHS CSV, with the pyarrow parser if installed."""
+    header = pd.read_csv(filename, nrows=0).columns
+    dtypes = {}
+    for col in header:
+        key = col.strip().lower().replace(' ', '_')
+        if key in FACILITY_DTYPES:
+            dtypes[col] = FACILITY_DTYPES[key]
+
+    try:
+        # Multithreaded parse straight into Arrow buffers
+        return pd.read_csv(filename, usecols=list(dtypes), dtype=dtypes, engine='pyarrow')
+    except ImportError:
+        return pd.read_csv(filename, usecols=list(dtypes), dtype=dtypes)
+
 
 def download_facility_data(facility_type, url):
-    """Download facility data from CA Open Data Portal."""
+    """Download facility data from CA Open Data Portal (cached locally as Parquet)."""
+    cache_file = f"cache_{facility_type}.parquet"
+    if os.path.exists(cache_file) and time.time() - os.path.getmtime(cache_file) < CACHE_TTL_SECONDS:
+        try:
+            df = pd.read_parquet(cache_file)
+            print(f"Loaded {len(df)} cached {facility_type} records from {cache_file}")
+            return df
+        except Exception as e:
+            print(f"  Could not read cache {cache_file}, re-downloading: {e}")
+
     print(f"Downloading {facility_type} data...")
     try:
-        response = requests.get(url, timeout=60)
-        response.raise_for_status()
-
-        # Save raw data
+        # Stream raw data straight to disk instead of buffering the whole CSV in memory
         filename = f"raw_{facility_type}.csv"
-        with open(filename, 'wb') as f:
-            f.write(response.content)
+        with requests.get(url, timeout=60, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            with open(filename, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=1 << 20)
         print(f"  Saved raw data to {filename}")
 
         # Read into DataFrame
-        df = pd.read_csv(filename, low_memory=False)
+        df = read_facility_csv(filename)
         print(f"  Loaded {len(df)} records")
+
+        # Cache as Parquet so warm runs skip the download and CSV parse
+        try:
+            df.to_parquet(cache_file, compression='zstd', index=False)
+        except Exception as e:
+            print(f"  Could not write cache {cache_file}: {e}")
         return df
     except requests.RequestException as e:
         print(f"  Error downloading {facility_type}: {e}")
         return pd.DataFrame()
 
 
+def with_fraud_flags(frame, flag_bits):
+    """Return a copy of frame with fraud_score/fraud_flags rendered from its flag bitmasks."""
+    return frame.assign(
+        fraud_score=FRAUD_FLAG_SCORES[flag_bits],
+        fraud_flags=FRAUD_FLAG_STRINGS[flag_bits],
+    )
+
+
+def normalize_strings(df, county_col=None, status_col=None):
+    """Add the upper-cased, trimmed comparison columns once so later steps don't re-normalize."""
+    df['address_normalized'] = (
+        df['facility_address'].str.upper()
+        .str.replace(ADDRESS_PUNCT_RE, '', regex=True)
+        .str.replace(WHITESPACE_RE, ' ', regex=True)
+        .str.strip()
+    )
+    df['city_normalized'] = df['facility_city'].str.upper().str.strip()
+    df['licensee_normalized'] = df['licensee'].str.upper().str.strip()
+
+    # County and status have only a handful of values - keep them as categoricals
+    if county_col:
+        df['county_normalized'] = df[county_col].str.strip().str.upper().astype('category')
+    if status_col:
+        df[status_col] = df[status_col].str.strip().str.upper().astype('category')
+    return df
+
+
 def analyze_low_capacity_facilities(capacity_threshold=14, counties=None):
     """
     Analyze childcare facilities for low capacity.
@@ -56,8 +177,15 @@ def analyze_low_capacity_facilities(capacity_threshold=14, counties=None):
     """
     all_facilities = []
 
-    for facility_type, url in DATA_URLS.items():
-        df = download_facility_data(facility_type, url)
+    # Fetch both datasets concurrently - the downloads are network-bound
+    with ThreadPoolExecutor(max_workers=len(DATA_URLS)) as executor:
+        futures = {
+            facility_type: executor.submit(download_facility_data, facility_type, url)
+            for facility_type, url in DATA_URLS.items()
+        }
+
+    for facility_type, future in futures.items():
+        df = future.result()
         if df.empty:
             continue
 
@@ -75,16 +203,27 @@ def analyze_low_capacity_facilities(capacity_threshold=14, counties=None):
         print("No data downloaded!")
         return pd.DataFrame()
 
+    # Align every dataset on the same typed columns first, so a column missing from
+    # one of them is added as a typed NA column rather than upcast to object by concat
+    all_cols = list(dict.fromkeys(col for df in all_facilities for col in df.columns))
+    for df in all_facilities:
+        for col in all_cols:
+            if col not in df.columns:
+                df[col] = pd.Series(index=df.index, dtype=FACILITY_DTYPES.get(col, 'str'))
+
     # Combine all facility types
-    combined = pd.concat(all_facilities, ignore_index=True)
+    combined = pd.concat([df[all_cols] for df in all_facilities], ignore_index=True)
     print(f"\nTotal facilities loaded: {len(combined)}")
 
-    # Find capacity column (varies by dataset)
-    capacity_col = None
-    for col in combined.columns:
-        if 'capacity' in col.lower():
-            capacity_col = col
-            break
+    # Find capacity, county and status columns (names vary by dataset)
+    cols_lower = {col.lower(): col for col in combined.columns}
+
+    def find_col(key):
+        return next((col for lower, col in cols_lower.items() if key in lower), None)
+
+    capacity_col = find_col('capacity')
+    county_col = find_col('county')
+    status_col = find_col('status')
 
     if not capacity_col:
         print("Warning: Could not find capacity column!")
@@ -93,27 +232,14 @@ def analyze_low_capacity_facilities(capacity_threshold=14, counties=None):
 
     print(f"Using capacity column: {capacity_col}")
 
-    # Find county column
-    county_col = None
-    for col in combined.columns:
-        if 'county' in col.lower():
-            county_col = col
-            break
-
-    # Find status column
-    status_col = None
-    for col in combined.columns:
-        if 'status' in col.lower() or 'facility_status' in col.lower():
-            status_col = col
-            break
-
     # Convert capacity to numeric
-    combined[capacity_col] = pd.to_numeric(combined[capacity_col], errors='coerce').fillna(0).astype(int)
+    combined[capacity_col] = combined[capacity_col].fillna(0).astype(int)
+
+    # Normalize addresses, cities, licensees, county and status once for every later comparison
+    combined = normalize_strings(combined, county_col, status_col)
 
     # Filter by county if specified
     if counties and county_col:
-        # Normalize county names for comparison
-        combined['county_normalized'] = combined[county_col].str.strip().str.upper()
         counties_upper = [c.upper() for c in counties]
         combined = combined[combined['county_normalized'].isin(counties_upper)]
         print(f"Filtered to {len(combined)} facilities in specified counties")
@@ -122,13 +248,13 @@ def analyze_low_capacity_facilities(capacity_threshold=14, counties=None):
     low_capacity = combined[
         (combined[capacity_col] > 0) &
         (combined[capacity_col] < capacity_threshold)
-    ].copy()
+    ]
 
     print(f"\nLow-capacity facilities (capacity < {capacity_threshold}): {len(low_capacity)}")
 
     # Save low capacity facilities
-    low_capacity.to_csv('low_capacity_daycares_ca.csv', index=False)
-    print("Saved to 'low_capacity_daycares_ca.csv'")
+    filename = save_output(low_capacity, 'low_capacity_daycares_ca')
+    print(f"Saved to '{filename}'")
 
     # Analysis: Count by county
     if county_col:
@@ -156,25 +282,25 @@ def analyze_low_capacity_facilities(capacity_threshold=14, counties=None):
 
         # Flag non-LICENSED facilities (CLOSED, INACTIVE, PENDING, ON PROBATION)
         suspicious = low_capacity[
-            ~low_capacity[status_col].str.upper().isin(['LICENSED'])
-        ].copy()
+            low_capacity[status_col] != 'LICENSED'
+        ]
 
         if not suspicious.empty:
-            suspicious.to_csv('suspicious_low_capacity_daycares.csv', index=False)
+            filename = save_output(suspicious, 'suspicious_low_capacity_daycares')
             print(f"\nNon-licensed low-capacity facilities: {len(suspicious)}")
-            print("Saved to 'suspicious_low_capacity_daycares.csv'")
+            print(f"Saved to '{filename}'")
 
             # Breakdown by status
             print("\nBreakdown of non-licensed:")
-            print(suspicious[status_col].value_counts())
+            print(suspicious[status_col].cat.remove_unused_categories().value_counts())
 
         # Also save only LICENSED low-capacity for comparison
         licensed_low_cap = low_capacity[
-            low_capacity[status_col].str.upper() == 'LICENSED'
+            low_capacity[status_col] == 'LICENSED'
         ]
-        licensed_low_cap.to_csv('licensed_low_capacity_daycares.csv', index=False)
+        filename = save_output(licensed_low_cap, 'licensed_low_capacity_daycares')
         print(f"\nActive licensed low-capacity facilities: {len(licensed_low_cap)}")
-        print("Saved to 'licensed_low_capacity_daycares.csv'")
+        print(f"Saved to '{filename}'")
 
     # Summary statistics
     print(f"\n{'='*50}")
@@ -201,19 +327,14 @@ def detect_fraud_indicators(df):
     print("FRAUD INDICATOR ANALYSIS")
     print("='*60")
 
-    # Standardize address for comparison
+    # Standardize address for comparison (address/city were normalized on load)
     df = df.copy()
-    df['address_normalized'] = (
-        df['facility_address'].str.upper().str.strip()
-        .str.replace(r'\s+', ' ', regex=True)
-        .str.replace(r'\.', '', regex=True)
-        .str.replace(r',', '', regex=True)
-    )
-    df['full_address'] = df['address_normalized'] + ', ' + df['facility_city'].str.upper().str.strip()
+    df['full_address'] = df['address_normalized'] + ', ' + df['city_normalized']
 
-    # Initialize fraud score
+    # Initialize fraud score (flags accumulate in flag_bits and are rendered on export)
     df['fraud_score'] = 0
     df['fraud_flags'] = ''
+    flag_bits = np.zeros(len(df), dtype=np.uint8)
 
     # =========================================
     # FLAG 1: Duplicate Addresses
@@ -221,28 +342,33 @@ def detect_fraud_indicators(df):
     print(f"\n[FLAG 1] DUPLICATE ADDRESSES")
     print("-" * 40)
 
-    address_counts = df['full_address'].value_counts()
-    duplicate_addresses = address_counts[address_counts > 1]
+    # One hashed pass gives every row the size of its address group
+    address_sizes = df.groupby('full_address')['full_address'].transform('size')
+    dup_mask = (address_sizes > 1).to_numpy()
 
-    if not duplicate_addresses.empty:
+    if dup_mask.any():
+        duplicate_addresses = df.loc[dup_mask, 'full_address'].value_counts()
         print(f"Found {len(duplicate_addresses)} addresses with multiple facilities:")
-        for addr, count in duplicate_addresses.head(20).items():
+        top_addresses = duplicate_addresses.head(20)
+        top_facilities = df.loc[
+            df['full_address'].isin(top_addresses.index),
+            ['full_address', 'facility_name', 'facility_capacity', 'facility_status']
+        ].groupby('full_address', sort=False)
+        for addr, count in top_addresses.items():
             print(f"  {count}x: {addr}")
-            facilities_at_addr = df[df['full_address'] == addr]
-            for _, fac in facilities_at_addr.iterrows():
-                print(f"      - {fac.get('facility_name', 'N/A')} (Cap: {fac.get('facility_capacity', 'N/A')}, Status: {fac.get('facility_status', 'N/A')})")
+            for fac in top_facilities.get_group(addr).itertuples(index=False):
+                print(f"      - {fac.facility_name} (Cap: {fac.facility_capacity}, Status: {fac.facility_status})")
 
         # Add to fraud score
-        df.loc[df['full_address'].isin(duplicate_addresses.index), 'fraud_score'] += 2
-        df.loc[df['full_address'].isin(duplicate_addresses.index), 'fraud_flags'] += 'DUPLICATE_ADDRESS; '
+        flag_bits[dup_mask] |= FLAG_DUPLICATE_ADDRESS
     else:
         print("  No duplicate addresses found.")
 
     # Save duplicate address facilities
-    dup_addr_facilities = df[df['full_address'].isin(duplicate_addresses.index)].copy()
+    dup_addr_facilities = with_fraud_flags(df[dup_mask], flag_bits[dup_mask])
     if not dup_addr_facilities.empty:
-        dup_addr_facilities.to_csv('fraud_flag_duplicate_addresses.csv', index=False)
-        print(f"\nSaved {len(dup_addr_facilities)} facilities at duplicate addresses to 'fraud_flag_duplicate_addresses.csv'")
+        filename = save_output(dup_addr_facilities, 'fraud_flag_duplicate_addresses')
+        print(f"\nSaved {len(dup_addr_facilities)} facilities at duplicate addresses to '{filename}'")
 
     # =========================================
     # FLAG 2: Licensees with Multiple Facilities
@@ -250,28 +376,27 @@ def detect_fraud_indicators(df):
     print(f"\n[FLAG 2] LICENSEES WITH MULTIPLE FACILITIES")
     print("-" * 40)
 
-    df['licensee_normalized'] = df['licensee'].str.upper().str.strip()
-    licensee_counts = df['licensee_normalized'].value_counts()
-    multi_facility_licensees = licensee_counts[licensee_counts >= 3]  # 3+ facilities
+    licensee_sizes = df.groupby('licensee_normalized')['licensee_normalized'].transform('size')
+    multi_lic_mask = (licensee_sizes >= 3).to_numpy()  # 3+ facilities
 
-    if not multi_facility_licensees.empty:
+    if multi_lic_mask.any():
+        multi_facility_licensees = df.loc[multi_lic_mask, 'licensee_normalized'].value_counts()
         print(f"Found {len(multi_facility_licensees)} licensees operating 3+ facilities:")
         for licensee, count in multi_facility_licensees.head(15).items():
             total_capacity = df[df['licensee_normalized'] == licensee]['facility_capacity'].sum()
             print(f"  {count} facilities: {licensee} (Total capacity: {total_capacity})")
 
         # Flag licensees with 5+ facilities (higher risk)
-        high_volume_licensees = licensee_counts[licensee_counts >= 5].index
-        df.loc[df['licensee_normalized'].isin(high_volume_licensees), 'fraud_score'] += 1
-        df.loc[df['licensee_normalized'].isin(high_volume_licensees), 'fraud_flags'] += 'HIGH_VOLUME_LICENSEE; '
+        high_vol_mask = (licensee_sizes >= 5).to_numpy()
+        flag_bits[high_vol_mask] |= FLAG_HIGH_VOLUME_LICENSEE
     else:
         print("  No licensees with 3+ facilities found.")
 
     # Save multi-facility licensee data
-    multi_lic_facilities = df[df['licensee_normalized'].isin(multi_facility_licensees.index)].copy()
+    multi_lic_facilities = with_fraud_flags(df[multi_lic_mask], flag_bits[multi_lic_mask])
     if not multi_lic_facilities.empty:
-        multi_lic_facilities.to_csv('fraud_flag_multi_facility_licensees.csv', index=False)
-        print(f"\nSaved {len(multi_lic_facilities)} facilities from multi-facility licensees to 'fraud_flag_multi_facility_licensees.csv'")
+        filename = save_output(multi_lic_facilities, 'fraud_flag_multi_facility_licensees')
+        print(f"\nSaved {len(multi_lic_facilities)} facilities from multi-facility licensees to '{filename}'")
 
     # =========================================
     # FLAG 3: COVID-Era Licenses (2020-2022)
@@ -282,23 +407,23 @@ def detect_fraud_indicators(df):
     df['license_first_date'] = pd.to_datetime(df['license_first_date'], errors='coerce')
     df['license_year'] = df['license_first_date'].dt.year
 
-    covid_era = df[
+    covid_era_mask = (
         (df['license_year'] >= 2020) &
         (df['license_year'] <= 2022) &
-        (df['facility_status'].str.upper() == 'LICENSED')
-    ]
+        (df['facility_status'] == 'LICENSED')
+    ).to_numpy()
+    covid_era = with_fraud_flags(df[covid_era_mask], flag_bits[covid_era_mask])
 
     print(f"Facilities licensed during COVID (2020-2022): {len(covid_era)}")
     print("\nBreakdown by year:")
     print(covid_era['license_year'].value_counts().sort_index())
 
     # Flag COVID-era licenses
-    covid_mask = (df['license_year'] >= 2020) & (df['license_year'] <= 2022)
-    df.loc[covid_mask, 'fraud_score'] += 1
-    df.loc[covid_mask, 'fraud_flags'] += 'COVID_ERA_LICENSE; '
+    covid_mask = ((df['license_year'] >= 2020) & (df['license_year'] <= 2022)).to_numpy()
+    flag_bits[covid_mask] |= FLAG_COVID_ERA_LICENSE
 
-    covid_era.to_csv('fraud_flag_covid_era_licenses.csv', index=False)
-    print(f"\nSaved to 'fraud_flag_covid_era_licenses.csv'")
+    filename = save_output(covid_era, 'fraud_flag_covid_era_licenses')
+    print(f"\nSaved to '{filename}'")
 
     # =========================================
     # FLAG 4: Recently Closed (Potential Hit-and-Run)
@@ -310,31 +435,30 @@ def detect_fraud_indicators(df):
     df['closed_year'] = df['closed_date'].dt.year
 
     # Facilities that opened during COVID and already closed
-    covid_opened_closed = df[
+    opened_closed_mask = (
         (df['license_year'] >= 2020) &
-        (df['facility_status'].str.upper() == 'CLOSED')
-    ]
+        (df['facility_status'] == 'CLOSED')
+    ).to_numpy()
+    covid_opened_closed = with_fraud_flags(df[opened_closed_mask], flag_bits[opened_closed_mask])
 
     print(f"Facilities opened 2020+ and now CLOSED: {len(covid_opened_closed)}")
 
     if not covid_opened_closed.empty:
         # Calculate how long they operated
-        covid_opened_closed = covid_opened_closed.copy()
         covid_opened_closed['months_operated'] = (
             (covid_opened_closed['closed_date'] - covid_opened_closed['license_first_date']).dt.days / 30
         ).round(1)
 
-        short_lived = covid_opened_closed[covid_opened_closed['months_operated'] < 24]
+        short_lived_mask = covid_opened_closed['months_operated'] < 24
+        short_lived = covid_opened_closed[short_lived_mask]
         print(f"  Operated less than 2 years: {len(short_lived)}")
 
         if not short_lived.empty:
-            short_lived.to_csv('fraud_flag_short_lived_facilities.csv', index=False)
-            print(f"  Saved to 'fraud_flag_short_lived_facilities.csv'")
+            filename = save_output(short_lived, 'fraud_flag_short_lived_facilities')
+            print(f"  Saved to '{filename}'")
 
-            # Add to fraud score
-            short_lived_idx = short_lived.index
-            df.loc[df.index.isin(short_lived_idx), 'fraud_score'] += 2
-            df.loc[df.index.isin(short_lived_idx), 'fraud_flags'] += 'SHORT_LIVED; '
+            # Add to fraud score (short_lived_mask is positional within opened_closed_mask)
+            flag_bits[np.flatnonzero(opened_closed_mask)[short_lived_mask.to_numpy()]] |= FLAG_SHORT_LIVED
 
     # =========================================
     # COMBINED HIGH-RISK FACILITIES
@@ -343,25 +467,32 @@ def detect_fraud_indicators(df):
     print("HIGH-RISK FACILITIES (Fraud Score >= 3)")
     print("='*60")
 
-    high_risk = df[df['fraud_score'] >= 3].copy()
+    df['fraud_score'] = FRAUD_FLAG_SCORES[flag_bits]
+    df['fraud_flags'] = FRAUD_FLAG_STRINGS[flag_bits]
+
+    high_risk = df[df['fraud_score'] >= 3]
 
     if not high_risk.empty:
         # Add Google Maps link for verification
-        high_risk['google_maps_url'] = high_risk.apply(
-            lambda row: f"https://www.google.com/maps/search/{quote(str(row['facility_address']) + ', ' + str(row['facility_city']) + ', CA')}",
-            axis=1
+        search_address = (
+            high_risk['facility_address'].fillna('') + ', ' +
+            high_risk['facility_city'].fillna('') + ', CA'
+        )
+        high_risk = high_risk.assign(
+            google_maps_url='https://www.google.com/maps/search/' + search_address.map(quote)
         )
 
         print(f"\nFound {len(high_risk)} high-risk facilities:")
-        for _, fac in high_risk.head(20).iterrows():
-            print(f"\n  {fac.get('facility_name', 'N/A')}")
-            print(f"    Address: {fac.get('facility_address', 'N/A')}, {fac.get('facility_city', 'N/A')}")
-            print(f"    Licensee: {fac.get('licensee', 'N/A')}")
-            print(f"    Capacity: {fac.get('facility_capacity', 'N/A')} | Status: {fac.get('facility_status', 'N/A')}")
-            print(f"    Licensed: {fac.get('license_first_date', 'N/A')}")
-            print(f"    Fraud Score: {fac['fraud_score']} | Flags: {fac['fraud_flags']}")
-            print(f"    Verify: {fac['google_maps_url']}")
-
+        for fac in high_risk.head(20).itertuples(index=False):
+            print(f"\n  {getattr(fac, 'facility_name', 'N/A')}")
+            print(f"    Address: {getattr(fac, 'facility_address', 'N/A')}, {getattr(fac, 'facility_city', 'N/A')}")
+            print(f"    Licensee: {getattr(fac, 'licensee', 'N/A')}")
+            print(f"    Capacity: {getattr(fac, 'facility_capacity', 'N/A')} | Status: {getattr(fac, 'facility_status', 'N/A')}")
+            print(f"    Licensed: {getattr(fac, 'license_first_date', 'N/A')}")
+            print(f"    Fraud Score: {fac.fraud_score} | Flags: {fac.fraud_flags}")
+            print(f"    Verify: {fac.google_maps_url}")
+
+        # Kept as CSV - this is the human-facing review list and the input to the map scripts
         high_risk.to_csv('HIGH_RISK_FACILITIES.csv', index=False)
         print(f"\n*** Saved {len(high_risk)} high-risk facilities to 'HIGH_RISK_FACILITIES.csv' ***")
     else:
@@ -383,10 +514,10 @@ def detect_fraud_indicators(df):
     print(f"\n{'='*60}")
     print("OUTPUT FILES GENERATED")
     print("='*60")
-    print("  - fraud_flag_duplicate_addresses.csv")
-    print("  - fraud_flag_multi_facility_licensees.csv")
-    print("  - fraud_flag_covid_era_licenses.csv")
-    print("  - fraud_flag_short_lived_facilities.csv")
+    print("  - fraud_flag_duplicate_addresses.parquet")
+    print("  - fraud_flag_multi_facility_licensees.parquet")
+    print("  - fraud_flag_covid_era_licenses.parquet")
+    print("  - fraud_flag_short_lived_facilities.parquet")
     print("  - HIGH_RISK_FACILITIES.csv  <-- START HERE")
 
     return df
@@ -4,168 +4,47 @@ Create a map showing facilities that share the same physical address.
 Similar to phone network map but for addresses.
 """
 
+import numpy as np
 import pandas as pd
 import folium
-from collections import defaultdict
-import re
-
-# Load data
-print("Loading duplicate address data...")
-df = pd.read_csv('fraud_flag_duplicate_addresses.csv')
-
-# Normalize addresses for grouping
-df['address_key'] = df['address_normalized'].str.upper().str.strip()
-
-# Group by normalized address
-address_groups = df.groupby('address_key').agg({
-    'facility_name': 'count',
-    'facility_number': list,
-    'licensee': list,
-    'facility_city': 'first',
-    'facility_zip': 'first',
-    'county_name': 'first',
-    'facility_status': list,
-    'facility_capacity': list,
-    'facility_address': 'first',
-    'facility_telephone_number': list
-}).reset_index()
-
-address_groups.columns = ['address_key', 'facility_count', 'facility_numbers', 'licensees',
-                          'city', 'zip_code', 'county', 'statuses', 'capacities',
-                          'address', 'phones']
-
-# Filter for addresses with 2+ facilities AND different licensees (more suspicious)
-suspicious_addresses = address_groups[address_groups['facility_count'] >= 2].copy()
-
-# Check if licensees are different (more suspicious than same licensee at same address)
-def has_different_licensees(licensees):
-    unique = set([l.upper().strip() for l in licensees if pd.notna(l)])
-    return len(unique) > 1
-
-suspicious_addresses['different_licensees'] = suspicious_addresses['licensees'].apply(has_different_licensees)
-
-# Filter for addresses with different licensees (most suspicious)
-most_suspicious = suspicious_addresses[suspicious_addresses['different_licensees']].copy()
-
-print(f"Total addresses with 2+ facilities: {len(suspicious_addresses)}")
-print(f"Addresses with DIFFERENT licensees: {len(most_suspicious)}")
-
-# Get facility details for mapping
-facility_details = df[['facility_number', 'facility_name', 'licensee', 'facility_address',
-                       'facility_city', 'facility_zip', 'county_name', 'facility_status',
-                       'facility_capacity', 'license_first_date', 'closed_date',
-                       'facility_telephone_number', 'fraud_score', 'address_key']].copy()
-
-# Load coordinates from the high risk facilities or raw data
-print("Loading coordinates...")
-try:
-    coords_df = pd.read_csv('HIGH_RISK_FACILITIES.csv')
-    # Check if lat/lng columns exist
-    if 'latitude' in coords_df.columns:
-        coords = coords_df[['facility_number', 'latitude', 'longitude']].drop_duplicates()
-        facility_details = facility_details.merge(coords, on='facility_number', how='left')
-except:
-    pass
-
-# If no coords, use zip code centroids
-if 'latitude' not in facility_details.columns or facility_details['latitude'].isna().all():
-    print("Using zip code centroids for coordinates...")
-    # California zip code centroids (approximate)
-    zip_coords = {
-        '90001': (33.9425, -118.2551), '90002': (33.9490, -118.2470),
-        '90210': (34.0901, -118.4065), '91101': (34.1478, -118.1445),
-        '92101': (32.7157, -117.1611), '94102': (37.7749, -122.4194),
-        '95814': (38.5816, -121.4944),
-    }
-    # For simplicity, use city-based approximate coords
-    city_coords = {
-        'LOS ANGELES': (34.0522, -118.2437), 'SAN DIEGO': (32.7157, -117.1611),
-        'SAN JOSE': (37.3382, -121.8863), 'SAN FRANCISCO': (37.7749, -122.4194),
-        'FRESNO': (36.7378, -119.7871), 'SACRAMENTO': (38.5816, -121.4944),
-        'LONG BEACH': (33.7701, -118.1937), 'OAKLAND': (37.8044, -122.2712),
-        'BAKERSFIELD': (35.3733, -119.0187), 'ANAHEIM': (33.8366, -117.9143),
-    }
-
-    def get_coords(row):
-        city = str(row['facility_city']).upper() if pd.notna(row['facility_city']) else ''
-        if city in city_coords:
-            return city_coords[city]
-        # Default to LA
-        return (34.0522, -118.2437)
-
-    facility_details['coords'] = facility_details.apply(get_coords, axis=1)
-    facility_details['latitude'] = facility_details['coords'].apply(lambda x: x[0])
-    facility_details['longitude'] = facility_details['coords'].apply(lambda x: x[1])
-
-# Create map
-print("Creating map...")
-ca_map = folium.Map(location=[37.5, -119.5], zoom_start=6, tiles='cartodbpositron')
-
-# Color palette for different address groups
-colors = ['#e94560', '#3498db', '#2ecc71', '#9b59b6', '#f39c12', '#1abc9c', '#e74c3c', '#34495e']
-
-# Add markers and lines for suspicious addresses
-address_count = 0
-facility_count = 0
-
-for idx, row in most_suspicious.head(100).iterrows():  # Limit to top 100 most suspicious
-    address_key = row['address_key']
-    facilities = facility_details[facility_details['address_key'] == address_key]
-
-    if len(facilities) < 2:
-        continue
-
-    color = colors[address_count % len(colors)]
-    address_count += 1
-
-    # Add markers for each facility
-    coords_list = []
-    for _, fac in facilities.iterrows():
-        lat = fac.get('latitude')
-        lng = fac.get('longitude')
-
-        if pd.isna(lat) or pd.isna(lng):
-            continue
+from folium.plugins import FastMarkerCluster
 
-        # Add small random offset so markers don't overlap
-        import random
-        lat += random.uniform(-0.001, 0.001)
-        lng += random.uniform(-0.001, 0.001)
-
-        coords_list.append((lat, lng))
-
-        popup_html = f"""
-        <div style="font-family: Arial; font-size: 12px; min-width: 200px;">
-            <b style="color: {color};">{fac['facility_name']}</b><br>
-            <b>Licensee:</b> {fac['licensee']}<br>
-            <b>Address:</b> {fac['facility_address']}, {fac['facility_city']}<br>
-            <b>Status:</b> {fac['facility_status']}<br>
-            <b>Capacity:</b> {fac['facility_capacity']}<br>
-            <b>Phone:</b> {fac['facility_telephone_number']}<br>
-            <b>Licensed:</b> {fac['license_first_date']}<br>
-            <hr style="margin: 5px 0;">
-            <span style="color: #e94560; font-weight: bold;">
-                {len(facilities)} facilities at this address
-            </span>
-        </div>
-        """
 
-        folium.CircleMarker(
-            location=[lat, lng],
-            radius=10,
-            color=color,
-            fill=True,
-            fillColor=color,
-            fillOpacity=0.8,
-            popup=folium.Popup(popup_html, max_width=300)
-        ).add_to(ca_map)
+# Builds each facility marker in the browser from a [lat, lng, color, popup_html] row
+MARKER_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 10, color: row[2], fill: true, fillColor: row[2], fillOpacity: 0.8
+    });
+    marker.bindPopup(row[3], {maxWidth: 300});
+    return marker;
+}
+"""
 
-        facility_count += 1
+# CSS for map positioning
+MAP_CSS = """
+<style>
+.folium-map {
+    position: fixed !important;
+    top: 65px !important;
+    bottom: 0 !important;
+    left: 0 !important;
+    right: 0 !important;
+    height: auto !important;
+}
+@media (max-width: 768px) {
+    .folium-map { top: 58px !important; }
+}
+@media (max-width: 480px) {
+    .folium-map { top: 52px !important; }
+}
+</style>
+"""
 
-print(f"Added {facility_count} facilities from {address_count} suspicious address groups")
 
-# Add custom header
-header_html = """
+def build_header_html(address_count, facility_count):
+    """Nav bar and info panel HTML with the cluster/facility counts filled in."""
+    return """
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
 .site-nav {
@@ -323,31 +202,161 @@ header_html = """
 </div>
 """
 
-# Add to map
-ca_map.get_root().html.add_child(folium.Element(header_html))
 
-# Add CSS for map positioning
-map_css = """
-<style>
-.folium-map {
-    position: fixed !important;
-    top: 65px !important;
-    bottom: 0 !important;
-    left: 0 !important;
-    right: 0 !important;
-    height: auto !important;
-}
-@media (max-width: 768px) {
-    .folium-map { top: 58px !important; }
-}
-@media (max-width: 480px) {
-    .folium-map { top: 52px !important; }
-}
-</style>
-"""
-ca_map.get_root().html.add_child(folium.Element(map_css))
+def main():
+
+    # Load data
+    print("Loading duplicate address data...")
+    try:
+        df = pd.read_parquet('fraud_flag_duplicate_addresses.parquet')
+    except (FileNotFoundError, ImportError):
+        # Older runs of ca_childcare_analysis.py wrote this output as CSV
+        df = pd.read_csv('fraud_flag_duplicate_addresses.csv')
+
+    # Normalize addresses and licensees for grouping
+    df['address_key'] = df['address_normalized']
+    df['licensee_normalized'] = df['licensee'].str.upper().str.strip()
+
+    # Count facilities and distinct licensees at each normalized address
+    address_groups = df.groupby('address_key')
+    facility_counts = address_groups.size()
+    licensee_counts = address_groups['licensee_normalized'].nunique()
+
+    # Filter for addresses with 2+ facilities
+    multi_facility = facility_counts >= 2
+    suspicious_addresses = facility_counts[multi_facility]
+
+    # Different licensees at the same address are more suspicious than one licensee with several sites
+    most_suspicious = (
+        facility_counts[multi_facility & (licensee_counts > 1)]
+        .rename('facility_count')
+        .reset_index()
+    )
+
+    print(f"Total addresses with 2+ facilities: {len(suspicious_addresses)}")
+    print(f"Addresses with DIFFERENT licensees: {len(most_suspicious)}")
+
+    # Get facility details for mapping
+    facility_details = df[['facility_number', 'facility_name', 'licensee', 'facility_address',
+                           'facility_city', 'facility_zip', 'county_name', 'facility_status',
+                           'facility_capacity', 'license_first_date', 'closed_date',
+                           'facility_telephone_number', 'fraud_score', 'address_key']].copy()
+
+    # Load coordinates from the high risk facilities or raw data
+    print("Loading coordinates...")
+    try:
+        coords_df = pd.read_csv('HIGH_RISK_FACILITIES.csv')
+        # Check if lat/lng columns exist
+        if 'latitude' in coords_df.columns:
+            coords = coords_df[['facility_number', 'latitude', 'longitude']].drop_duplicates()
+            facility_details = facility_details.merge(coords, on='facility_number', how='left')
+    except:
+        pass
+
+    # If no coords, use zip code centroids
+    if 'latitude' not in facility_details.columns or facility_details['latitude'].isna().all():
+        print("Using zip code centroids for coordinates...")
+        # California zip code centroids (approximate)
+        zip_coords = {
+            '90001': (33.9425, -118.2551), '90002': (33.9490, -118.2470),
+            '90210': (34.0901, -118.4065), '91101': (34.1478, -118.1445),
+            '92101': (32.7157, -117.1611), '94102': (37.7749, -122.4194),
+            '95814': (38.5816, -121.4944),
+        }
+        # For simplicity, use city-based approximate coords
+        city_coords = {
+            'LOS ANGELES': (34.0522, -118.2437), 'SAN DIEGO': (32.7157, -117.1611),
+            'SAN JOSE': (37.3382, -121.8863), 'SAN FRANCISCO': (37.7749, -122.4194),
+            'FRESNO': (36.7378, -119.7871), 'SACRAMENTO': (38.5816, -121.4944),
+            'LONG BEACH': (33.7701, -118.1937), 'OAKLAND': (37.8044, -122.2712),
+            'BAKERSFIELD': (35.3733, -119.0187), 'ANAHEIM': (33.8366, -117.9143),
+        }
+
+        city_lat = {city: coords[0] for city, coords in city_coords.items()}
+        city_lng = {city: coords[1] for city, coords in city_coords.items()}
+
+        # Look up each city once per column; unknown cities default to LA
+        cities = facility_details['facility_city'].str.upper()
+        facility_details['latitude'] = cities.map(city_lat).fillna(34.0522)
+        facility_details['longitude'] = cities.map(city_lng).fillna(-118.2437)
+
+    # Create map
+    print("Creating map...")
+    ca_map = folium.Map(location=[37.5, -119.5], zoom_start=6, tiles='cartodbpositron')
+
+    # Color palette for different address groups
+    colors = ['#e94560', '#3498db', '#2ecc71', '#9b59b6', '#f39c12', '#1abc9c', '#e74c3c', '#34495e']
+
+    # Add markers and lines for suspicious addresses
+    address_count = 0
+    facility_count = 0
+    marker_rows = []
+
+    top_suspicious = most_suspicious.head(100)  # Limit to top 100 most suspicious
+
+    # Split the facilities at those addresses into per-address groups once
+    address_facilities = dict(tuple(
+        facility_details[facility_details['address_key'].isin(top_suspicious['address_key'])]
+        .groupby('address_key', sort=False)
+    ))
+
+    for row in top_suspicious.itertuples(index=False):
+        address_key = row.address_key
+        facilities = address_facilities.get(address_key)
+
+        if facilities is None or len(facilities) < 2:
+            continue
+
+        color = colors[address_count % len(colors)]
+        address_count += 1
+
+        # Small random offsets so markers at the same address don't overlap
+        lat_jitter = np.random.uniform(-0.001, 0.001, len(facilities))
+        lng_jitter = np.random.uniform(-0.001, 0.001, len(facilities))
+
+        # Add markers for each facility
+        coords_list = []
+        for i, fac in enumerate(facilities.itertuples(index=False)):
+            if pd.isna(fac.latitude) or pd.isna(fac.longitude):
+                continue
+
+            lat = fac.latitude + lat_jitter[i]
+            lng = fac.longitude + lng_jitter[i]
+
+            coords_list.append((lat, lng))
+
+            popup_html = (
+                f'<div style="font-family: Arial; font-size: 12px; min-width: 200px;">'
+                f'<b style="color: {color};">{fac.facility_name}</b><br>'
+                f'<b>Licensee:</b> {fac.licensee}<br>'
+                f'<b>Address:</b> {fac.facility_address}, {fac.facility_city}<br>'
+                f'<b>Status:</b> {fac.facility_status}<br>'
+                f'<b>Capacity:</b> {fac.facility_capacity}<br>'
+                f'<b>Phone:</b> {fac.facility_telephone_number}<br>'
+                f'<b>Licensed:</b> {fac.license_first_date}<br>'
+                f'<hr style="margin: 5px 0;">'
+                f'<span style="color: #e94560; font-weight: bold;">{len(facilities)} facilities at this address</span>'
+                f'</div>'
+            )
+            marker_rows.append([lat, lng, color, popup_html])
+
+            facility_count += 1
+
+    # Build every marker client-side in one layer instead of one folium object each
+    FastMarkerCluster(marker_rows, callback=MARKER_CALLBACK).add_to(ca_map)
+
+    print(f"Added {facility_count} facilities from {address_count} suspicious address groups")
+
+    # Add custom header and map positioning CSS
+    ca_map.get_root().html.add_child(folium.Element(build_header_html(address_count, facility_count)))
+    ca_map.get_root().html.add_child(folium.Element(MAP_CSS))
+
+    # Save
+    print("Saving map...")
+    ca_map.save('address-network-map.html')
+    print("Done! Created address-network-map.html")
+
+
 
-# Save
-print("Saving map...")
-ca_map.save('address-network-map.html')
-print("Done! Created address-network-map.html")
+if __name__ == "__main__":
+    main()
@@ -4,19 +4,18 @@ Create a map showing licensees who operate multiple facilities with fraud flags.
 Focuses on suspicious patterns rather than legitimate large operators.
 """
 
+import re
+import html
+import json
+import argparse
+import numpy as np
 import pandas as pd
 import folium
+from folium.plugins import FastMarkerCluster
 from collections import defaultdict
 
-# Load data
-print("Loading high risk facilities data...")
-df = pd.read_csv('HIGH_RISK_FACILITIES.csv')
-
-# Normalize licensee names
-df['licensee_clean'] = df['licensee'].str.upper().str.strip()
-
 # Known legitimate large operators to exclude
-legitimate_large_operators = [
+LEGITIMATE_LARGE_OPERATORS = [
     'LAUSD', 'LOS ANGELES UNIFIED', 'BRIGHT HORIZONS', 'KINDERCARE',
     'YMCA', 'BOYS & GIRLS CLUB', 'HEAD START', 'COMMUNITY CHILD CARE COUNCIL',
     'CHILDREN\'S WORLD', 'LA PETITE', 'CHILDTIME', 'TUTOR TIME',
@@ -25,54 +24,11 @@ legitimate_large_operators = [
     'COUNTY OFFICE OF EDUCATION', 'PTSA', 'PTA'
 ]
 
-def is_legitimate_operator(name):
-    name_upper = str(name).upper()
-    for legit in legitimate_large_operators:
-        if legit in name_upper:
-            return True
-    return False
-
-# Filter out legitimate large operators
-df_suspicious = df[~df['licensee_clean'].apply(is_legitimate_operator)].copy()
-
-# Group by licensee
-licensee_groups = df_suspicious.groupby('licensee_clean').agg({
-    'facility_number': 'count',
-    'facility_name': list,
-    'fraud_score': list,
-    'facility_status': list,
-    'facility_city': list,
-    'facility_address': list,
-    'facility_telephone_number': list,
-    'county_name': list
-}).reset_index()
-
-licensee_groups.columns = ['licensee', 'facility_count', 'names', 'scores',
-                           'statuses', 'cities', 'addresses', 'phones', 'counties']
-
-# Filter for licensees with 3+ facilities (suspicious for non-large-operators)
-suspicious_licensees = licensee_groups[licensee_groups['facility_count'] >= 3].copy()
-
-# Calculate average risk score
-suspicious_licensees['avg_score'] = suspicious_licensees['scores'].apply(lambda x: sum(x)/len(x) if x else 0)
-
-# Sort by facility count and average score
-suspicious_licensees = suspicious_licensees.sort_values(['facility_count', 'avg_score'], ascending=[False, False])
-
-print(f"Found {len(suspicious_licensees)} licensees with 3+ facilities (excluding known large operators)")
-print(f"Top 10 by facility count:")
-for _, row in suspicious_licensees.head(10).iterrows():
-    print(f"  {row['licensee']}: {row['facility_count']} facilities, avg score: {row['avg_score']:.1f}")
-
-# Get detailed facility info for mapping
-facility_details = df_suspicious[['facility_number', 'facility_name', 'licensee', 'licensee_clean',
-                                   'facility_address', 'facility_city', 'facility_zip',
-                                   'county_name', 'facility_status', 'facility_capacity',
-                                   'license_first_date', 'closed_date', 'fraud_score',
-                                   'facility_telephone_number', 'fraud_flags']].copy()
-
-# City coordinates for mapping
-city_coords = {
+# One alternation pattern so the screen is a single regex pass over the column
+LEGITIMATE_OPERATOR_RE = re.compile('|'.join(map(re.escape, LEGITIMATE_LARGE_OPERATORS)))
+
+# City coordinates, used for facilities whose zip isn't in the gazetteer
+CITY_COORDS = {
     'LOS ANGELES': (34.0522, -118.2437), 'SAN DIEGO': (32.7157, -117.1611),
     'SAN JOSE': (37.3382, -121.8863), 'SAN FRANCISCO': (37.7749, -122.4194),
     'FRESNO': (36.7378, -119.7871), 'SACRAMENTO': (38.5816, -121.4944),
@@ -124,102 +80,76 @@ city_coords = {
     'FOLSOM': (38.6780, -121.1761), 'PLEASANTON': (37.6624, -121.8747),
     'LYNWOOD': (33.9303, -118.2115), 'ROSEMEAD': (34.0806, -118.0728)
 }
+CITY_LATS = {city: lat for city, (lat, _) in CITY_COORDS.items()}
+CITY_LNGS = {city: lng for city, (_, lng) in CITY_COORDS.items()}
 
-def get_coords(city):
-    if pd.isna(city):
-        return None
-    city_upper = str(city).upper().strip()
-    if city_upper in city_coords:
-        return city_coords[city_upper]
-    return None
-
-# Create map
-print("Creating map...")
-ca_map = folium.Map(location=[37.5, -119.5], zoom_start=6, tiles='cartodbpositron')
+# Census ZCTA gazetteer (same file as the phone map)
+ZIP_GAZETTEER_PATH = '/Users/corygoat/Desktop/PPP Loans/2023_Gaz_zcta_national.txt'
 
 # Colors for different licensee groups
-colors = ['#e94560', '#3498db', '#2ecc71', '#9b59b6', '#f39c12',
+COLORS = ['#e94560', '#3498db', '#2ecc71', '#9b59b6', '#f39c12',
           '#1abc9c', '#e74c3c', '#34495e', '#16a085', '#d35400']
 
-owner_count = 0
-facility_count = 0
-
-# Add markers for top 50 suspicious licensees
-for idx, row in suspicious_licensees.head(50).iterrows():
-    licensee = row['licensee']
-    facilities = facility_details[facility_details['licensee_clean'] == licensee]
-
-    if len(facilities) < 3:
-        continue
-
-    color = colors[owner_count % len(colors)]
-
-    # Get coordinates for each facility
-    fac_coords = []
-    for _, fac in facilities.iterrows():
-        coords = get_coords(fac['facility_city'])
-        if coords:
-            # Add small offset for visualization
-            import random
-            lat = coords[0] + random.uniform(-0.02, 0.02)
-            lng = coords[1] + random.uniform(-0.02, 0.02)
-            fac_coords.append((lat, lng, fac))
-
-    if len(fac_coords) < 2:
-        continue
-
-    owner_count += 1
-
-    # Add markers and lines
-    for lat, lng, fac in fac_coords:
-        flags = str(fac.get('fraud_flags', '')).replace(';', ', ').strip(', ')
-
-        popup_html = f"""
-        <div style="font-family: Arial; font-size: 12px; min-width: 220px;">
-            <b style="color: {color};">{fac['facility_name']}</b><br>
-            <b>Licensee:</b> {fac['licensee']}<br>
-            <b>Address:</b> {fac['facility_address']}, {fac['facility_city']}<br>
-            <b>Status:</b> {fac['facility_status']}<br>
-            <b>Risk Score:</b> {fac['fraud_score']}<br>
-            <b>Phone:</b> {fac['facility_telephone_number']}<br>
-            <b>Flags:</b> {flags if flags else 'None'}<br>
-            <hr style="margin: 5px 0;">
-            <span style="color: {color}; font-weight: bold;">
-                This licensee operates {len(facilities)} facilities
-            </span>
-        </div>
-        """
-
-        folium.CircleMarker(
-            location=[lat, lng],
-            radius=8 + min(len(facilities), 10),  # Larger radius for more facilities
-            color=color,
-            fill=True,
-            fillColor=color,
-            fillOpacity=0.7,
-            popup=folium.Popup(popup_html, max_width=300)
-        ).add_to(ca_map)
-
-        facility_count += 1
-
-    # Draw lines connecting facilities of same licensee
-    if len(fac_coords) >= 2:
-        coords_only = [(lat, lng) for lat, lng, _ in fac_coords]
-        # Connect all points
-        for i in range(len(coords_only)):
-            for j in range(i + 1, len(coords_only)):
-                folium.PolyLine(
-                    locations=[coords_only[i], coords_only[j]],
-                    color=color,
-                    weight=2,
-                    opacity=0.5,
-                    dash_array='5, 5'
-                ).add_to(ca_map)
-
-print(f"Added {facility_count} facilities from {owner_count} suspicious licensees")
-
-# Add header
-header_html = f"""
+# Marker popup, filled once per facility
+POPUP_TEMPLATE = (
+    '<div style="font-family: Arial; font-size: 12px; min-width: 220px;">'
+    '<b style="color: {color};">{fac.facility_name}</b><br>'
+    '<b>Licensee:</b> {fac.licensee}<br>'
+    '<b>Address:</b> {fac.facility_address}, {fac.facility_city}<br>'
+    '<b>Status:</b> {fac.facility_status}<br>'
+    '<b>Risk Score:</b> {fac.fraud_score}<br>'
+    '<b>Phone:</b> {fac.facility_telephone_number}<br>'
+    '<b>Flags:</b> {fac.flags_text}<br>'
+    '<hr style="margin: 5px 0;">'
+    '<span style="color: {color}; font-weight: bold;">This licensee operates {network_size} facilities</span>'
+    '</div>'
+)
+
+# Builds each facility marker in the browser from a [lat, lng, color, radius, popup_html] row
+MARKER_CALLBACK = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: row[3], color: row[2], fill: true, fillColor: row[2], fillOpacity: 0.7
+    });
+    marker.bindPopup(row[4], {maxWidth: 300});
+    return marker;
+}
+"""
+
+# Draws every licensee's lines in the browser from one compact JSON blob (filled with
+# the line rows and the map's JS name); runs once the page's scripts have defined the map
+LINES_JS = """
+document.addEventListener('DOMContentLoaded', function () {
+    var lines = %s;
+    lines.forEach(function (line) {
+        L.polyline(line[1], {color: line[0], weight: 2, opacity: 0.5, dashArray: '5, 5'}).addTo(%s);
+    });
+});
+"""
+
+# CSS for map positioning
+MAP_CSS = """
+<style>
+.folium-map {
+    position: fixed !important;
+    top: 65px !important;
+    bottom: 0 !important;
+    left: 0 !important;
+    right: 0 !important;
+    height: auto !important;
+}
+@media (max-width: 768px) {
+    .folium-map { top: 58px !important; }
+}
+@media (max-width: 480px) {
+    .folium-map { top: 52px !important; }
+}
+</style>
+"""
+
+
+def build_header_html(owner_count, facility_count):
+    return f"""
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
 .site-nav {{
@@ -381,30 +311,189 @@ header_html = f"""
 </div>
 """
 
-ca_map.get_root().html.add_child(folium.Element(header_html))
 
-# Map positioning CSS
-map_css = """
-<style>
-.folium-map {
-    position: fixed !important;
-    top: 65px !important;
-    bottom: 0 !important;
-    left: 0 !important;
-    right: 0 !important;
-    height: auto !important;
-}
-@media (max-width: 768px) {
-    .folium-map { top: 58px !important; }
-}
-@media (max-width: 480px) {
-    .folium-map { top: 52px !important; }
-}
-</style>
-"""
-ca_map.get_root().html.add_child(folium.Element(map_css))
+def load_zip_coords(path=ZIP_GAZETTEER_PATH):
+    """Zip code centroids from the Census ZCTA gazetteer (empty if the file isn't there)."""
+    print("Loading zip code coordinates...")
+    try:
+        # Only parse the zip and centroid columns (the header pads some names with spaces)
+        zip_header = pd.read_csv(path, sep='\t', nrows=0).columns
+        zip_cols = [col for col in zip_header if col.strip() in ('GEOID', 'INTPTLAT', 'INTPTLONG')]
+        try:
+            zip_coords = pd.read_csv(path, sep='\t', usecols=zip_cols, dtype={'GEOID': str}, engine='pyarrow')
+        except ImportError:
+            zip_coords = pd.read_csv(path, sep='\t', usecols=zip_cols, dtype={'GEOID': str})
+    except FileNotFoundError:
+        print(f"Zip gazetteer not found at {path}, using city centroids only")
+        return pd.DataFrame({'zip_clean': pd.Series(dtype=str), 'zip_lat': pd.Series(dtype=float),
+                             'zip_lng': pd.Series(dtype=float)})
+
+    zip_coords.columns = zip_coords.columns.str.strip()
+    zip_coords = zip_coords.rename(columns={'GEOID': 'zip_clean', 'INTPTLAT': 'zip_lat', 'INTPTLONG': 'zip_lng'})
+    zip_coords['zip_clean'] = zip_coords['zip_clean'].str.strip()
+    zip_coords = zip_coords.drop_duplicates('zip_clean', keep='last')
+    print(f"Loaded {len(zip_coords)} zip code coordinates")
+    return zip_coords
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--score-quantile', type=float, default=0.0,
+        help="only draw markers for facilities whose fraud_score is at or above this quantile of all "
+             "high-risk facilities, e.g. 0.75 for the top quarter (licensee facility counts still "
+             "include every facility; default: draw all)"
+    )
+    args = parser.parse_args()
+
+    # Load data
+    print("Loading high risk facilities data...")
+    # Only the columns the map uses; repeated low-cardinality text columns are read as categoricals,
+    # and the free-text columns are typed as strings here so nothing downstream needs astype(str)
+    read_kwargs = dict(
+        usecols=['facility_number', 'facility_name', 'licensee', 'facility_address', 'facility_city',
+                 'facility_zip', 'county_name', 'facility_status', 'facility_capacity',
+                 'license_first_date', 'closed_date', 'fraud_score', 'facility_telephone_number',
+                 'fraud_flags'],
+        dtype={'facility_zip': str, 'facility_name': str, 'licensee': str, 'facility_address': str,
+               'facility_telephone_number': str, 'fraud_flags': str, 'facility_city': 'category',
+               'facility_status': 'category', 'county_name': 'category'},
+    )
+    try:
+        df = pd.read_csv('HIGH_RISK_FACILITIES.csv', engine='pyarrow', **read_kwargs)
+    except ImportError:
+        df = pd.read_csv('HIGH_RISK_FACILITIES.csv', **read_kwargs)
+
+    # Facilities below this score still count toward their licensee but get no marker
+    marker_min_score = np.quantile(df['fraud_score'].to_numpy(), args.score_quantile)
+    if args.score_quantile > 0:
+        print(f"Drawing markers for facilities with fraud score >= {marker_min_score:g}")
+
+    # Normalize licensee names
+    df['licensee_clean'] = df['licensee'].str.upper().str.strip().astype('category')
+
+    # Filter out legitimate large operators
+    is_legitimate = df['licensee_clean'].str.contains(LEGITIMATE_OPERATOR_RE, na=False)
+    df_suspicious = df[~is_legitimate].copy()
+
+    # Count facilities and average risk score per licensee (row detail is pulled from facility_details later)
+    licensee_groups = df_suspicious.groupby('licensee_clean', observed=True).agg(
+        facility_count=('facility_number', 'count'),
+        avg_score=('fraud_score', 'mean'),
+    ).rename_axis('licensee').reset_index()
+
+    # Filter for licensees with 3+ facilities (suspicious for non-large-operators)
+    suspicious_licensees = licensee_groups[licensee_groups['facility_count'] >= 3]
+
+    # Sort by facility count and average score
+    suspicious_licensees = suspicious_licensees.sort_values(['facility_count', 'avg_score'], ascending=[False, False])
+
+    print(f"Found {len(suspicious_licensees)} licensees with 3+ facilities (excluding known large operators)")
+    print(f"Top 10 by facility count:")
+    for row in suspicious_licensees.head(10).itertuples(index=False):
+        print(f"  {row.licensee}: {row.facility_count} facilities, avg score: {row.avg_score:.1f}")
+
+    # Only the top 50 licensees are mapped, so geocode/jitter/escape just their facilities
+    top_licensees = suspicious_licensees.head(50)
+
+    # Get detailed facility info for mapping
+    facility_details = df_suspicious.loc[df_suspicious['licensee_clean'].isin(top_licensees['licensee']),
+                                      ['facility_number', 'facility_name', 'licensee', 'licensee_clean',
+                                       'facility_address', 'facility_city', 'facility_zip',
+                                       'county_name', 'facility_status', 'facility_capacity',
+                                       'license_first_date', 'closed_date', 'fraud_score',
+                                       'facility_telephone_number', 'fraud_flags']].copy()
+
+    # Locate each facility by its zip centroid, falling back to its city centroid
+    # (NaN where neither is known)
+    facility_details['zip_clean'] = facility_details['facility_zip'].str.slice(0, 5)
+    facility_details = facility_details.merge(load_zip_coords(), on='zip_clean', how='left')
+    city_norm = facility_details['facility_city'].str.upper().str.strip()
+    facility_details['lat_base'] = facility_details['zip_lat'].fillna(city_norm.map(CITY_LATS))
+    facility_details['lng_base'] = facility_details['zip_lng'].fillna(city_norm.map(CITY_LNGS))
+
+    # Small random offsets for visualization, drawn for every facility in one call
+    jitter = np.random.uniform(-0.02, 0.02, size=(len(facility_details), 2))
+    facility_details['lat'] = facility_details['lat_base'] + jitter[:, 0]
+    facility_details['lng'] = facility_details['lng_base'] + jitter[:, 1]
+
+    # Escape popup text and format the flag list for every facility up front
+    for col in ['facility_name', 'licensee', 'facility_address', 'facility_city',
+                'facility_status', 'facility_telephone_number']:
+        facility_details[col] = facility_details[col].map(html.escape, na_action='ignore')
+    flags_text = facility_details['fraud_flags'].fillna('').str.replace(';', ', ').str.strip(', ')
+    facility_details['flags_text'] = flags_text.mask(flags_text == '', 'None')
+
+    # Create map
+    print("Creating map...")
+    ca_map = folium.Map(location=[37.5, -119.5], zoom_start=6, tiles='cartodbpositron')
+
+    owner_count = 0
+    facility_count = 0
+    marker_rows = []
+    line_rows = []
+
+    # Split the facilities of those licensees into per-licensee groups once
+    licensee_facilities = dict(tuple(facility_details.groupby('licensee_clean', sort=False, observed=True)))
+
+    # Add markers for top 50 suspicious licensees
+    for row in top_licensees.itertuples(index=False):
+        facilities = licensee_facilities.get(row.licensee)
+
+        if facilities is None or len(facilities) < 3:
+            continue
+
+        color = COLORS[owner_count % len(COLORS)]
+
+        # Get coordinates for each facility
+        fac_coords = []
+        for fac in facilities.itertuples(index=False):
+            if fac.fraud_score >= marker_min_score and not pd.isna(fac.lat):
+                fac_coords.append((fac.lat, fac.lng, fac))
+
+        if len(fac_coords) < 2:
+            continue
+
+        owner_count += 1
+
+        # Add markers and lines
+        for lat, lng, fac in fac_coords:
+            popup_html = POPUP_TEMPLATE.format(fac=fac, color=color, network_size=len(facilities))
+
+            radius = 8 + min(len(facilities), 10)  # Larger radius for more facilities
+            marker_rows.append([lat, lng, color, radius, popup_html])
+
+            facility_count += 1
+
+        # Draw lines connecting facilities of same licensee as a star from the most
+        # central facility (k-1 segments in one polyline instead of every pair)
+        if len(fac_coords) >= 2:
+            coords_only = np.array([(lat, lng) for lat, lng, _ in fac_coords]).round(6)
+            total_dist = np.linalg.norm(coords_only[:, None] - coords_only[None, :], axis=-1).sum(axis=1)
+            hub_idx = total_dist.argmin()
+            hub = coords_only[hub_idx].tolist()
+            line_rows.append([color, [[hub, point] for i, point in enumerate(coords_only.tolist()) if i != hub_idx]])
+
+    # Build every marker client-side in one clustered layer instead of one folium object each
+    FastMarkerCluster(marker_rows, callback=MARKER_CALLBACK).add_to(ca_map)
+
+    # Draw every licensee's lines in the browser from one compact JSON blob
+    lines_js = LINES_JS % (json.dumps(line_rows, separators=(',', ':')), ca_map.get_name())
+    ca_map.get_root().script.add_child(folium.Element(lines_js))
+
+    print(f"Added {facility_count} facilities from {owner_count} suspicious licensees")
+
+    # Add header
+    ca_map.get_root().html.add_child(folium.Element(build_header_html(owner_count, facility_count)))
+
+    # Map positioning CSS
+    ca_map.get_root().html.add_child(folium.Element(MAP_CSS))
+
+    # Save
+    print("Saving map...")
+    ca_map.save('owner-network-map.html')
+    print("Done! Created owner-network-map.html")
+
 
-# Save
-print("Saving map...")
-ca_map.save('owner-network-map.html')
-print("Done! Created owner-network-map.html")
+if __name__ == "__main__":
+    main()
@@ -8,11 +8,18 @@ in the $250M Feeding Our Future fraud case in Minnesota.
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import time
 import re
-from difflib import SequenceMatcher
+import html
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from rapidfuzz import fuzz  # C++ edit-distance ratio, much faster than difflib
+except ImportError:
+    fuzz = None
+    from difflib import SequenceMatcher
 
 # California counties
 CA_COUNTIES = [
@@ -27,67 +34,122 @@ CA_COUNTIES = [
     "Tuolumne", "Ventura", "Yolo", "Yuba"
 ]
 
-def fetch_county_cacfp(county_name):
-    """Fetch CACFP sites for a single county"""
+# Street addresses and phone numbers in the county page text, matched in a single scan
+# (the repeats ahead of each keyword are bounded, so a long page with no match can't backtrack quadratically)
+ADDRESS_PATTERN = r'\d{1,6}\s{1,10}[\w\s]{1,60}?(?:Street|St|Avenue|Ave|Boulevard|Blvd|Road|Rd|Drive|Dr|Lane|Ln|Way|Court|Ct)[\w\s,]{0,80}?(?:CA|California)\s*\d{5}'
+PHONE_PATTERN = r'\(?\d{3}\)?[\s.-]?\d{3}[\s.-]\d{4}'
+PAGE_ITEM_RE = re.compile(f'(?P<address>{ADDRESS_PATTERN})|(?P<phone>{PHONE_PATTERN})', re.IGNORECASE)
+
+# Name normalization patterns, compiled once rather than looked up on every call
+NAME_SUFFIX_RE = re.compile(r'\s*(LLC|INC|CORP|L\.L\.C\.|INCORPORATED|CORPORATION)\s*$')
+NAME_PUNCT_RE = re.compile(r'[^\w\s]')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# CACFP pages are UTF-8, decoded directly rather than charset-sniffed
+HTML_ENCODING = 'utf-8'
+
+# Markup stripped from county pages before the text is searched
+SCRIPT_STYLE_RE = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+
+# County pages don't change between runs, so responses are cached on disk when requests_cache
+# is installed (reruns replay from cacfp_cache.sqlite instead of hitting the CACFP site again)
+try:
+    import requests_cache
+    SESSION = requests_cache.CachedSession('cacfp_cache', expire_after=7 * 24 * 3600, allowable_codes=(200,))
+except ImportError:
+    SESSION = requests.Session()
+
+# One pooled connection per worker thread, with retries (and backoff) on transient errors
+SESSION.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(
+    total=3, status_forcelist=[429, 500, 502, 503, 504], backoff_factor=0.3)))
+SESSION.headers['User-Agent'] = 'california-daycare-investigation/1.0'
+
+# County pages fetched at once; the requests are all network wait, so threads overlap cleanly
+COUNTY_WORKERS = 16
+
+def fetch_county_cacfp(county_name, flagged_names=None, max_name_words=0):
+    """Fetch CACFP sites for a single county, optionally listing flagged facility names on the page"""
     url = f"https://cacfp.dss.ca.gov/Centers/PartialCounty?countyName={county_name.replace(' ', '+')}"
 
     try:
-        response = requests.get(url, timeout=30)
+        response = SESSION.get(url, timeout=30)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        sites = []
-
-        # Find all site entries - the page structure uses cards or divs for each sponsor
-        # Parse the content to extract facility information
-        content = soup.get_text()
-
-        # The page lists sponsors and their sites
-        # We need to parse the structure
-
-        # Look for address patterns and facility names
-        # This is a simplified approach - may need refinement based on actual HTML structure
-
-        cards = soup.find_all(['div', 'section'], class_=lambda x: x and ('card' in str(x).lower() or 'site' in str(x).lower() or 'facility' in str(x).lower()))
-
-        if not cards:
-            # Try finding any structured content
-            cards = soup.find_all('div', class_=True)
-
-        # Extract text content that looks like addresses
-        address_pattern = r'(\d+\s+[\w\s]+(?:Street|St|Avenue|Ave|Boulevard|Blvd|Road|Rd|Drive|Dr|Lane|Ln|Way|Court|Ct)[\w\s,]*(?:CA|California)\s*\d{5})'
-
-        addresses_found = re.findall(address_pattern, content, re.IGNORECASE)
-
-        return {
+        # Only the page text is searched, so strip the markup with regexes instead of building a
+        # DOM: drop script/style blocks and tags, then decode entities
+        body = response.content.decode(HTML_ENCODING, errors='replace')
+        content = html.unescape(TAG_RE.sub(' ', SCRIPT_STYLE_RE.sub(' ', body)))
+
+        # Extract text content that looks like addresses or phone numbers in one pass
+        addresses_found = []
+        phones_found = []
+        for match in PAGE_ITEM_RE.finditer(content):
+            if match.lastgroup == 'address':
+                addresses_found.append(match.group('address'))
+            else:
+                phones_found.append(match.group('phone'))
+
+        result = {
             'county': county_name,
             'url': url,
             'addresses_found': len(addresses_found),
+            'phones_found': len(phones_found),
             'raw_text_length': len(content)
         }
+        if flagged_names:
+            result['flagged_names_found'] = sorted(find_flagged_names(content, flagged_names, max_name_words))
+        return result
 
     except Exception as e:
         print(f"  Error fetching {county_name}: {e}")
         return {'county': county_name, 'error': str(e)}
 
+def fetch_all_counties(flagged_names=None, max_name_words=0):
+    """Fetch every county's CACFP page concurrently (results in CA_COUNTIES order)"""
+    with ThreadPoolExecutor(max_workers=COUNTY_WORKERS) as executor:
+        return list(executor.map(lambda county: fetch_county_cacfp(county, flagged_names, max_name_words),
+                                 CA_COUNTIES))
+
 def normalize_name(name):
     """Normalize facility name for matching"""
     if not name:
         return ''
     name = str(name).upper().strip()
     # Remove common suffixes
-    name = re.sub(r'\s*(LLC|INC|CORP|L\.L\.C\.|INCORPORATED|CORPORATION)\s*$', '', name)
+    name = NAME_SUFFIX_RE.sub('', name)
     # Remove punctuation
-    name = re.sub(r'[^\w\s]', '', name)
+    name = NAME_PUNCT_RE.sub('', name)
     # Normalize whitespace
-    name = re.sub(r'\s+', ' ', name).strip()
+    name = WHITESPACE_RE.sub(' ', name).strip()
     return name
 
+def normalize_series(names):
+    """Normalize a whole column of facility names for matching (same rules as normalize_name)"""
+    return (names.fillna('').astype(str).str.upper().str.strip()
+            .str.replace(NAME_SUFFIX_RE, '', regex=True)
+            .str.replace(NAME_PUNCT_RE, '', regex=True)
+            .str.replace(WHITESPACE_RE, ' ', regex=True)
+            .str.strip())
+
+def find_flagged_names(text, flagged_names, max_name_words):
+    """Flagged (normalized) facility names that appear in the text
+
+    Looks every run of up to max_name_words normalized words up in the name set, so the
+    cost is linear in the page length no matter how many flagged names there are.
+    """
+    words = normalize_name(text).split()
+    found = set()
+    for n in range(1, max_name_words + 1):
+        found.update({' '.join(words[i:i + n]) for i in range(len(words) - n + 1)} & flagged_names)
+    return found
+
 def name_similarity(name1, name2):
     """Calculate similarity between two names"""
     n1 = normalize_name(name1)
     n2 = normalize_name(name2)
+    if fuzz is not None:
+        return fuzz.ratio(n1, n2) / 100.0
     return SequenceMatcher(None, n1, n2).ratio()
 
 print("Loading flagged daycare facilities...")
@@ -108,6 +170,13 @@ else:
 
 print(high_risk[name_col].head(10).tolist())
 
+# Matching key for cross-referencing, normalized for the whole column in one pass
+high_risk['name_normalized'] = normalize_series(high_risk[name_col])
+
+# Names to look for on CACFP pages; single words (e.g. "PRESCHOOL") would match far too much text
+flagged_names = {name for name in high_risk['name_normalized'] if ' ' in name}
+max_name_words = max((name.count(' ') + 1 for name in flagged_names), default=0)
+
 print("\n" + "="*60)
 print("CACFP DATA SOURCES")
 print("="*60)
@@ -131,9 +200,19 @@ To cross-reference flagged daycares with CACFP participants, you can:
 
 # Test fetching one county
 print("\nTesting fetch for San Francisco County...")
-result = fetch_county_cacfp("San Francisco")
+result = fetch_county_cacfp("San Francisco", flagged_names, max_name_words)
 print(f"Result: {result}")
 
+# Fetch every county
+print(f"\nFetching all {len(CA_COUNTIES)} counties...")
+county_results = fetch_all_counties(flagged_names, max_name_words)
+fetched = [r for r in county_results if 'error' not in r]
+print(f"Fetched {len(fetched)} of {len(CA_COUNTIES)} county pages, "
+      f"{sum(r['addresses_found'] for r in fetched)} addresses found")
+for r in fetched:
+    if r.get('flagged_names_found'):
+        print(f"  {r['county']}: {', '.join(r['flagged_names_found'])}")
+
 print("\n" + "="*60)
 print("IMPORTANT FRAUD INDICATORS")
 print("="*60)
@@ -9,11 +9,25 @@ This script fetches available inspection reports for high-risk facilities.
 
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+try:
+    import lxml  # noqa: F401 -- C parser, much faster than html.parser on large pages
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
 import time
 import re
 import os
+import argparse
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -21,14 +35,52 @@ warnings.filterwarnings('ignore')
 FACILITY_VISITS_URL = "https://www.ccld.dss.ca.gov/carefacilitysearch/FacDetail/{facility_number}"
 REPORT_API_URL = "https://www.ccld.dss.ca.gov/transparencyapi/api/FacilityReports"
 
+# CCLD pages are UTF-8; naming it up front spares BeautifulSoup's charset sniffing on
+# every body (it still falls back to detection if a page won't decode)
+HTML_ENCODING = 'utf-8'
+
+# The facility page is only searched for links and visit tables, so nothing else is parsed
+LINK_TABLE_STRAINER = SoupStrainer(['a', 'table'])
+
+# Report/visit dates (M/D/YYYY)
+DATE_RE = re.compile(r'(\d{1,2}/\d{1,2}/\d{4})')
+
+# Report index in a FacilityReports link
+REPORT_INDEX_RE = re.compile(r'[?&]inx=(\d+)', re.IGNORECASE)
+
+# Columns (and Parquet types) of inspection_reports_found, one row per report
+REPORT_COLUMNS = {
+    'report_index': 'int64', 'url': 'string', 'date': 'string', 'has_type_a_violation': 'bool',
+    'has_type_b_violation': 'bool', 'has_any_violation': 'bool', 'is_complaint_investigation': 'bool',
+    'text_preview': 'string', 'facility_number': 'string', 'facility_name': 'string',
+    'licensee': 'string', 'risk_score': 'int64', 'facility_status': 'string',
+}
+REPORT_SCHEMA = pa.schema([(col, pa.type_for_alias(t)) for col, t in REPORT_COLUMNS.items()]) if pa else None
+
+# Facilities checked concurrently (each one still sleeps between its own requests)
+MAX_WORKERS = 8
+
+# Report pages don't change between runs, so responses are cached on disk when requests_cache
+# is installed (reruns replay from ccld_cache.sqlite instead of hitting CCLD again)
+try:
+    import requests_cache
+    SESSION = requests_cache.CachedSession('ccld_cache', expire_after=7 * 24 * 3600, allowable_codes=(200,))
+except ImportError:
+    SESSION = requests.Session()
+
+# One pooled connection per worker thread, with retries (and backoff) on transient errors
+SESSION.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(
+    total=3, status_forcelist=[429, 500, 502, 503, 504], backoff_factor=0.3)))
+SESSION.headers['User-Agent'] = 'california-daycare-investigation/1.0'
+
 
 def get_facility_visits_page(facility_number):
     """Fetch the facility detail page to find inspection report links."""
     url = FACILITY_VISITS_URL.format(facility_number=facility_number)
     try:
-        response = requests.get(url, timeout=30)
+        response = SESSION.get(url, timeout=30)
         if response.status_code == 200:
-            return response.text
+            return response.content
     except Exception as e:
         print(f"    Error fetching facility page: {e}")
     return None
@@ -39,7 +91,8 @@ def parse_inspection_links(html_content):
     if not html_content:
         return []
 
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, HTML_PARSER, from_encoding=HTML_ENCODING,
+                         parse_only=LINK_TABLE_STRAINER)
     reports = []
 
     # Look for links to inspection reports
@@ -62,7 +115,7 @@ def parse_inspection_links(html_content):
                 # Check for date patterns in cells
                 for cell in cells:
                     text = cell.get_text(strip=True)
-                    if re.search(r'\d{1,2}/\d{1,2}/\d{4}', text):
+                    if DATE_RE.search(text):
                         link = cell.find('a')
                         if link and link.get('href'):
                             reports.append({
@@ -77,9 +130,9 @@ def parse_inspection_links(html_content):
 def fetch_report_content(url):
     """Fetch and parse an inspection report."""
     try:
-        response = requests.get(url, timeout=30)
+        response = SESSION.get(url, timeout=30)
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.content, HTML_PARSER, from_encoding=HTML_ENCODING)
 
             # Extract key information from the report
             report_data = {
@@ -87,12 +140,12 @@ def fetch_report_content(url):
                 'raw_text': soup.get_text(separator=' ', strip=True)[:5000]  # First 5000 chars
             }
 
-            # Look for violation types
-            text = report_data['raw_text'].upper()
-            report_data['has_type_a'] = 'TYPE A' in text
-            report_data['has_type_b'] = 'TYPE B' in text
-            report_data['has_violations'] = 'VIOLATION' in text or 'DEFICIENCY' in text
-            report_data['has_complaint'] = 'COMPLAINT' in text
+            # Look for violation types (one lowercased copy for every keyword check)
+            text = report_data['raw_text'].lower()
+            report_data['has_type_a'] = 'type a' in text
+            report_data['has_type_b'] = 'type b' in text
+            report_data['has_violations'] = 'violation' in text or 'deficiency' in text
+            report_data['has_complaint'] = 'complaint' in text
 
             return report_data
     except Exception as e:
@@ -100,33 +153,50 @@ def fetch_report_content(url):
     return None
 
 
+def discover_report_indices(facility_number):
+    """Report indices linked from the facility detail page (empty if none could be found)."""
+    links = parse_inspection_links(get_facility_visits_page(facility_number))
+    indices = set()
+    for link in links:
+        match = REPORT_INDEX_RE.search(link['url'])
+        if match and 'FacilityReports' in link['url']:
+            indices.add(int(match.group(1)))
+    return sorted(indices)
+
+
 def check_facility_reports(facility_number, facility_name):
     """Check for inspection reports for a specific facility."""
     print(f"  Checking {facility_name} ({facility_number})...")
 
-    # Try direct API call with different indices
+    # Fetch only the reports the detail page links to; if it lists none, probe the first
+    # 5 possible report indices directly
+    report_indices = discover_report_indices(facility_number) or range(5)
     reports_found = []
 
-    for inx in range(5):  # Check first 5 possible report indices
+    for inx in report_indices:
         url = f"{REPORT_API_URL}?facNum={facility_number}&inx={inx}"
         try:
-            response = requests.get(url, timeout=15)
-            if response.status_code == 200 and len(response.text) > 500:
+            response = SESSION.get(url, timeout=15)
+            # Only build the DOM for bodies that mention a facility somewhere (empty-index
+            # responses don't, so they skip the parse entirely)
+            if (response.status_code == 200 and len(response.content) > 500
+                    and b'facility' in response.content.lower()):
                 # Parse the report
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = BeautifulSoup(response.content, HTML_PARSER, from_encoding=HTML_ENCODING)
                 text = soup.get_text(separator=' ', strip=True)
+                # Lowercased once and reused for the facility check and every violation keyword
+                text_lower = text.lower()
 
-                if 'facility' in text.lower() and len(text) > 100:
+                if len(text) > 100 and 'facility' in text_lower:
                     # Extract date if present
-                    date_match = re.search(r'(\d{1,2}/\d{1,2}/\d{4})', text)
+                    date_match = DATE_RE.search(text)
                     report_date = date_match.group(1) if date_match else 'Unknown'
 
                     # Check for violations
-                    text_upper = text.upper()
-                    has_type_a = 'TYPE A' in text_upper
-                    has_type_b = 'TYPE B' in text_upper
-                    has_violations = 'VIOLATION' in text_upper or 'DEFICIENCY' in text_upper or 'CITATION' in text_upper
-                    has_complaint = 'COMPLAINT' in text_upper
+                    has_type_a = 'type a' in text_lower
+                    has_type_b = 'type b' in text_lower
+                    has_violations = 'violation' in text_lower or 'deficiency' in text_lower or 'citation' in text_lower
+                    has_complaint = 'complaint' in text_lower
 
                     reports_found.append({
                         'report_index': inx,
@@ -148,15 +218,50 @@ def check_facility_reports(facility_number, facility_name):
     return reports_found
 
 
-def analyze_high_risk_facilities():
+def save_results(df, stem, write_csv=False):
+    """Write results as zstd Parquet (plus CSV if asked, or instead if pyarrow is missing)."""
+    paths = []
+    try:
+        df.to_parquet(f'{stem}.parquet', compression='zstd', index=False)
+        paths.append(f'{stem}.parquet')
+    except ImportError:
+        write_csv = True
+    if write_csv:
+        df.to_csv(f'{stem}.csv', index=False)
+        paths.append(f'{stem}.csv')
+    return paths
+
+
+def append_reports(batch, stem, writer, first, write_csv=False):
+    """Append one facility's report rows to {stem}.parquet (and .csv); returns the Parquet writer."""
+    if pq is not None:
+        table = pa.Table.from_pandas(batch, schema=REPORT_SCHEMA, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(f'{stem}.parquet', REPORT_SCHEMA, compression='zstd')
+        writer.write_table(table)
+    if write_csv or pq is None:
+        batch.to_csv(f'{stem}.csv', mode='w' if first else 'a', header=first, index=False)
+    return writer
+
+
+def analyze_high_risk_facilities(write_csv=False):
     """Fetch inspection data for all high-risk facilities."""
     print("="*60)
     print("FETCHING INSPECTION REPORTS FOR HIGH-RISK FACILITIES")
     print("="*60)
 
-    # Load priority investigation list
+    # Load priority investigation list (only the columns the crawl uses, where present)
     try:
-        df = pd.read_csv('PRIORITY_INVESTIGATION_LIST.csv')
+        list_columns = pd.read_csv('PRIORITY_INVESTIGATION_LIST.csv', nrows=0).columns
+        read_kwargs = dict(
+            usecols=[col for col in ['facility_number', 'facility_name', 'licensee', 'risk_score',
+                                     'facility_status'] if col in list_columns],
+            dtype={'facility_number': 'Int64', 'risk_score': 'int8'},
+        )
+        try:
+            df = pd.read_csv('PRIORITY_INVESTIGATION_LIST.csv', engine='pyarrow', **read_kwargs)
+        except ImportError:
+            df = pd.read_csv('PRIORITY_INVESTIGATION_LIST.csv', **read_kwargs)
     except FileNotFoundError:
         print("ERROR: PRIORITY_INVESTIGATION_LIST.csv not found")
         print("Run fraud_deep_analysis.py first")
@@ -166,69 +271,83 @@ def analyze_high_risk_facilities():
 
     # Focus on highest risk (score >= 7)
     high_risk = df[df['risk_score'] >= 7].copy()
+    if 'facility_number' in high_risk.columns:
+        # Facility numbers as plain strings (<NA> where missing)
+        high_risk['facility_number'] = high_risk['facility_number'].astype('string')
     print(f"Checking {len(high_risk)} facilities with risk score >= 7")
 
-    all_reports = []
+    # Report rows are written out facility by facility rather than held until the end
+    report_count = 0
+    report_writer = None
     facilities_with_violations = []
 
-    for i, (_, row) in enumerate(high_risk.iterrows()):
-        facility_number = row.get('facility_number')
-        facility_name = row.get('facility_name', 'Unknown')
-
-        if pd.isna(facility_number):
-            continue
-
-        # Convert to string and clean
-        facility_number = str(int(facility_number)) if not pd.isna(facility_number) else None
-        if not facility_number:
-            continue
-
-        print(f"\n[{i+1}/{len(high_risk)}] {facility_name}")
-
-        reports = check_facility_reports(facility_number, facility_name)
-
-        if reports:
-            for report in reports:
-                report['facility_number'] = facility_number
-                report['facility_name'] = facility_name
-                report['licensee'] = row.get('licensee', '')
-                report['risk_score'] = row.get('risk_score', 0)
-                report['facility_status'] = row.get('facility_status', '')
-                all_reports.append(report)
-
-                if report.get('has_any_violation') or report.get('has_type_a_violation'):
-                    facilities_with_violations.append({
-                        'facility_number': facility_number,
-                        'facility_name': facility_name,
-                        'licensee': row.get('licensee', ''),
-                        'risk_score': row.get('risk_score', 0),
-                        'report_date': report.get('date', ''),
-                        'type_a_violation': report.get('has_type_a_violation', False),
-                        'type_b_violation': report.get('has_type_b_violation', False),
-                        'complaint_investigation': report.get('is_complaint_investigation', False),
-                        'report_url': report.get('url', '')
-                    })
-
-        # Rate limiting
-        time.sleep(0.5)
-
-        # Progress checkpoint
-        if (i + 1) % 50 == 0:
-            print(f"\n--- Progress: {i+1}/{len(high_risk)} facilities checked ---")
-            print(f"--- Reports found: {len(all_reports)} ---")
-            print(f"--- Facilities with violations: {len(facilities_with_violations)} ---\n")
+    # One tuple per facility with a facility number; columns the list doesn't have get the
+    # same defaults the row lookups used
+    defaults = {'facility_number': pd.NA, 'facility_name': 'Unknown', 'licensee': '',
+                'risk_score': 0, 'facility_status': ''}
+    facilities = high_risk.assign(**{col: value for col, value in defaults.items()
+                                     if col not in high_risk.columns})
+    to_check = [fac for fac in facilities[list(defaults)].itertuples(index=False)
+                if not pd.isna(fac.facility_number)]
+
+    # The crawl is bound by request latency, so several facilities are checked at once
+    # (each worker still rate limits its own requests); results come back in order
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(
+            lambda fac: check_facility_reports(fac.facility_number, fac.facility_name),
+            to_check
+        )
+
+        for i, (fac, reports) in enumerate(zip(to_check, results)):
+            print(f"\n[{i+1}/{len(to_check)}] {fac.facility_name}")
+
+            if reports:
+                for report in reports:
+                    report['facility_number'] = fac.facility_number
+                    report['facility_name'] = fac.facility_name
+                    report['licensee'] = fac.licensee
+                    report['risk_score'] = fac.risk_score
+                    report['facility_status'] = fac.facility_status
+
+                    if report.get('has_any_violation') or report.get('has_type_a_violation'):
+                        facilities_with_violations.append({
+                            'facility_number': fac.facility_number,
+                            'facility_name': fac.facility_name,
+                            'licensee': fac.licensee,
+                            'risk_score': fac.risk_score,
+                            'report_date': report.get('date', ''),
+                            'type_a_violation': report.get('has_type_a_violation', False),
+                            'type_b_violation': report.get('has_type_b_violation', False),
+                            'complaint_investigation': report.get('is_complaint_investigation', False),
+                            'report_url': report.get('url', '')
+                        })
+
+                batch = pd.DataFrame(reports, columns=list(REPORT_COLUMNS))
+                report_writer = append_reports(batch, 'inspection_reports_found', report_writer,
+                                               report_count == 0, write_csv)
+                report_count += len(batch)
+
+            # Progress checkpoint
+            if (i + 1) % 50 == 0:
+                print(f"\n--- Progress: {i+1}/{len(to_check)} facilities checked ---")
+                print(f"--- Reports found: {report_count} ---")
+                print(f"--- Facilities with violations: {len(facilities_with_violations)} ---\n")
 
     # Save results
-    if all_reports:
-        reports_df = pd.DataFrame(all_reports)
-        reports_df.to_csv('inspection_reports_found.csv', index=False)
-        print(f"\nSaved {len(reports_df)} inspection reports to 'inspection_reports_found.csv'")
+    if report_count:
+        paths = []
+        if report_writer is not None:
+            report_writer.close()
+            paths.append('inspection_reports_found.parquet')
+        if write_csv or pq is None:
+            paths.append('inspection_reports_found.csv')
+        print(f"\nSaved {report_count} inspection reports to {', '.join(paths)}")
 
     if facilities_with_violations:
         violations_df = pd.DataFrame(facilities_with_violations)
         violations_df = violations_df.sort_values('risk_score', ascending=False)
-        violations_df.to_csv('FACILITIES_WITH_VIOLATIONS.csv', index=False)
-        print(f"Saved {len(violations_df)} facilities with violations to 'FACILITIES_WITH_VIOLATIONS.csv'")
+        paths = save_results(violations_df, 'FACILITIES_WITH_VIOLATIONS', write_csv)
+        print(f"Saved {len(violations_df)} facilities with violations to {', '.join(paths)}")
 
         # Print summary
         print(f"\n{'='*60}")
@@ -245,31 +364,35 @@ def analyze_high_risk_facilities():
         print(f"Complaint investigations: {complaint_count}")
 
         print(f"\nTop facilities with violations:")
-        for _, row in violations_df.head(20).iterrows():
+        for row in violations_df.head(20).itertuples(index=False):
             flags = []
-            if row['type_a_violation']:
+            if row.type_a_violation:
                 flags.append("TYPE A")
-            if row['type_b_violation']:
+            if row.type_b_violation:
                 flags.append("TYPE B")
-            if row['complaint_investigation']:
+            if row.complaint_investigation:
                 flags.append("COMPLAINT")
 
-            print(f"\n  {row['facility_name']}")
-            print(f"    Licensee: {row['licensee']}")
-            print(f"    Risk Score: {row['risk_score']} | Violations: {', '.join(flags)}")
-            print(f"    Report: {row['report_url']}")
+            print(f"\n  {row.facility_name}")
+            print(f"    Licensee: {row.licensee}")
+            print(f"    Risk Score: {row.risk_score} | Violations: {', '.join(flags)}")
+            print(f"    Report: {row.report_url}")
 
     # Summary
     print(f"\n{'='*60}")
     print("INSPECTION REPORT ANALYSIS COMPLETE")
     print("="*60)
     print(f"Facilities checked: {len(high_risk)}")
-    print(f"Reports found: {len(all_reports)}")
+    print(f"Reports found: {report_count}")
     print(f"Facilities with violations: {len(facilities_with_violations)}")
     print(f"\nOutput files:")
-    print(f"  - inspection_reports_found.csv")
-    print(f"  - FACILITIES_WITH_VIOLATIONS.csv")
+    print(f"  - inspection_reports_found.parquet")
+    print(f"  - FACILITIES_WITH_VIOLATIONS.parquet")
 
 
 if __name__ == "__main__":
-    analyze_high_risk_facilities()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--csv', action='store_true',
+                        help="also write CSV copies of the result files next to the Parquet ones")
+    args = parser.parse_args()
+    analyze_high_risk_facilities(write_csv=args.csv)
@@ -20,19 +20,79 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
+# Generic/suspicious licensee naming patterns, combined into one alternation so the
+# licensee column is scanned once
+SUSPICIOUS_NAME_PATTERNS = [
+    r'^[A-Z]\s*&\s*[A-Z]\s',  # A & B pattern
+    r'LEARNING CENTER',
+    r'CHILD DEVELOPMENT',
+    r'LITTLE\s*(ONES|ANGELS|STARS|KIDS)',
+    r'^(ABC|123)',
+    r'KIDZ|KIDDS|KIDDZ',
+    r'ACADEMY\s*LLC',
+    r'BRIGHT\s*(START|FUTURE|HORIZON)',
+]
+GENERIC_NAME_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in SUSPICIOUS_NAME_PATTERNS))
+
+# Business suffixes removed (anywhere in the name) before looking for person names
+PERSON_SUFFIX_RE = re.compile(r' LLC| INC| CORP| L\.L\.C\.?')
+
+# Everything but the digits of a phone number
+NON_DIGIT_RE = re.compile(r'\D+')
+
+# First two whitespace-separated words of a licensee name
+LICENSEE_PREFIX_RE = re.compile(r'^(\S+)(?:\s+(\S+))?')
+
+# Raw columns the analyses use, and the repeated low-cardinality ones kept as categoricals
+RAW_USECOLS = ['facility_name', 'licensee', 'facility_address', 'facility_city', 'facility_zip',
+               'county_name', 'facility_capacity', 'facility_status', 'facility_telephone_number',
+               'license_first_date', 'closed_date']
+CATEGORY_COLS = ['county_name', 'facility_city', 'facility_status', 'facility_zip', 'facility_type']
+
+# Date format of license_first_date/closed_date in the CCLD exports (e.g. 6/11/2010)
+DATE_FORMAT = '%m/%d/%Y'
+
+def read_raw_csv(filename, usecols, **kwargs):
+    """Read columns of a raw facility CSV, with the pyarrow parser if installed."""
+    try:
+        return pd.read_csv(filename, usecols=usecols, engine='pyarrow', **kwargs)
+    except ImportError:
+        return pd.read_csv(filename, usecols=usecols, low_memory=False, **kwargs)
+
+
+def upper_stripped(values):
+    """Uppercase and trim a text column, as one Arrow kernel chain when pyarrow is installed."""
+    if pc is None:
+        return values.str.upper().str.strip()
+    cleaned = pc.utf8_trim_whitespace(pc.utf8_upper(pa.array(values, type=pa.string())))
+    return cleaned.to_pandas().set_axis(values.index)
+
+
 # Load the facility data
 def load_data():
     """Load all facility data from previously downloaded CSVs."""
     print("Loading facility data...")
 
     try:
-        centers = pd.read_csv('raw_child_care_centers.csv', low_memory=False)
-        homes = pd.read_csv('raw_family_child_care_homes.csv', low_memory=False)
+        centers = read_raw_csv('raw_child_care_centers.csv', RAW_USECOLS)
+        homes = read_raw_csv('raw_family_child_care_homes.csv', RAW_USECOLS)
 
         centers['facility_type'] = 'child_care_center'
         homes['facility_type'] = 'family_child_care_home'
 
         df = pd.concat([centers, homes], ignore_index=True)
+        # Categorize after the concat so both files share one set of categories
+        df[CATEGORY_COLS] = df[CATEGORY_COLS].astype('category')
+        # Parse dates once, with an explicit format, for every analysis that needs them
+        df['license_date'] = pd.to_datetime(df['license_first_date'], errors='coerce', format=DATE_FORMAT)
+        df['license_year'] = df['license_date'].dt.year.astype('Int16')
+        df['closed_date_parsed'] = pd.to_datetime(df['closed_date'], errors='coerce', format=DATE_FORMAT)
         print(f"Loaded {len(df)} total facilities")
         return df
     except FileNotFoundError:
@@ -50,13 +110,12 @@ def analyze_duplicate_phones(df):
     print("="*60)
 
     # Clean phone numbers
-    df = df.copy()
-    df['phone_clean'] = df['facility_telephone_number'].astype(str).str.replace(r'[^\d]', '', regex=True)
-    df['phone_clean'] = df['phone_clean'].replace('', np.nan).replace('nan', np.nan)
+    # (digits only; missing and short numbers are left as NA so they never match)
+    phone_digits = df['facility_telephone_number'].astype('string').str.replace(NON_DIGIT_RE, '', regex=True)
+    df['phone_clean'] = phone_digits.where(phone_digits.str.len() >= 10)
 
-    # Find duplicates (exclude NaN and short numbers)
-    valid_phones = df[df['phone_clean'].str.len() >= 10]['phone_clean']
-    phone_counts = valid_phones.value_counts()
+    # Find duplicates (value_counts skips the NA phones)
+    phone_counts = df['phone_clean'].value_counts()
     dup_phones = phone_counts[phone_counts > 1]
 
     print(f"Found {len(dup_phones)} phone numbers used by multiple facilities")
@@ -65,10 +124,18 @@ def analyze_duplicate_phones(df):
     suspicious_phones = phone_counts[phone_counts >= 3]
     print(f"Phone numbers with 3+ facilities: {len(suspicious_phones)}")
 
+    # Facility counts, licensees and facility names of the top suspicious phones, gathered
+    # in one groupby over just their rows instead of rescanning the frame per phone
+    top_phones = suspicious_phones.head(50)
+    phone_groups = df[df['phone_clean'].isin(top_phones.index)].groupby('phone_clean', sort=False).agg(
+        facility_count=('facility_name', 'size'),
+        licensees=('licensee', lambda s: list(pd.unique(s))),
+        facilities=('facility_name', lambda s: list(s.head(5))),
+    ).reindex(top_phones.index)
+
     results = []
-    for phone, count in suspicious_phones.head(50).items():
-        facilities = df[df['phone_clean'] == phone]
-        licensees = facilities['licensee'].unique()
+    for group in phone_groups.itertuples():
+        licensees = group.licensees
 
         # More suspicious if different licensee names
         if len(licensees) > 1:
@@ -77,26 +144,29 @@ def analyze_duplicate_phones(df):
             suspicion = "Medium - Same licensee"
 
         results.append({
-            'phone': phone,
-            'facility_count': count,
+            'phone': group.Index,
+            'facility_count': group.facility_count,
             'unique_licensees': len(licensees),
             'licensees': '; '.join(str(l) for l in licensees[:5]),
             'suspicion_level': suspicion,
-            'facilities': '; '.join(facilities['facility_name'].head(5).tolist())
+            'facilities': '; '.join(group.facilities)
         })
 
     dup_phone_df = pd.DataFrame(results)
     if not dup_phone_df.empty:
-        # Sort by suspicion (different licensees first)
-        dup_phone_df = dup_phone_df.sort_values(['unique_licensees', 'facility_count'], ascending=[False, False])
+        # Top 15 by suspicion (different licensees first), picked without a full sort
+        suspicion_cols = ['unique_licensees', 'facility_count']
+        high_suspicion = dup_phone_df[dup_phone_df['unique_licensees'] > 1].nlargest(15, suspicion_cols)
+
+        # Sort by suspicion for the saved file
+        dup_phone_df = dup_phone_df.sort_values(suspicion_cols, ascending=[False, False])
         dup_phone_df.to_csv('fraud_analysis_duplicate_phones.csv', index=False)
 
         print("\nMost suspicious (different licensees, same phone):")
-        high_suspicion = dup_phone_df[dup_phone_df['unique_licensees'] > 1]
-        for _, row in high_suspicion.head(15).iterrows():
-            print(f"\n  Phone: {row['phone']} ({row['facility_count']} facilities)")
-            print(f"    Licensees: {row['licensees']}")
-            print(f"    Facilities: {row['facilities']}")
+        for row in high_suspicion.itertuples(index=False):
+            print(f"\n  Phone: {row.phone} ({row.facility_count} facilities)")
+            print(f"    Licensees: {row.licensees}")
+            print(f"    Facilities: {row.facilities}")
 
         print(f"\nSaved to 'fraud_analysis_duplicate_phones.csv'")
 
@@ -118,52 +188,32 @@ def analyze_licensee_patterns(df):
     print("ANALYSIS 2: LICENSEE NAME PATTERNS (Shell Company Detection)")
     print("="*60)
 
-    df = df.copy()
-    df['licensee_clean'] = df['licensee'].str.upper().str.strip()
-
-    # Extract potential person names from LLCs
-    def extract_person_name(licensee):
-        if pd.isna(licensee):
-            return None
-        licensee = str(licensee).upper()
-        # Remove common business suffixes
-        for suffix in [' LLC', ' INC', ' INC.', ' CORP', ' CORPORATION', ' L.L.C.', ' L.L.C']:
-            licensee = licensee.replace(suffix, '')
-        # If it looks like a person name (comma separated or short)
-        if ',' in licensee or len(licensee.split()) <= 3:
-            return licensee.strip()
-        return None
+    df['licensee_clean'] = upper_stripped(df['licensee'])
 
-    df['possible_person'] = df['licensee'].apply(extract_person_name)
+    # Extract potential person names from LLCs: drop common business suffixes, then keep
+    # names that look like a person (comma separated or short)
+    licensee_upper = df['licensee_clean'].str.replace(PERSON_SUFFIX_RE, '', regex=True)
+    looks_like_person = (licensee_upper.str.contains(',', regex=False, na=False)
+                         | (licensee_upper.str.split().str.len() <= 3))
+    df['possible_person'] = licensee_upper.str.strip().where(looks_like_person)
 
     # Find people with multiple facilities under different business names
-    person_counts = df[df['possible_person'].notna()].groupby('possible_person').agg({
-        'facility_name': 'count',
-        'licensee': lambda x: list(x.unique())
-    }).reset_index()
+    # (facility counts and first-seen unique business names, both on the built-in groupby paths)
+    persons = df.dropna(subset=['possible_person'])
+    facility_counts = persons.groupby('possible_person', sort=False)['facility_name'].count()
+    business_names = (persons[['possible_person', 'licensee']].drop_duplicates()
+                      .groupby('possible_person', sort=False)['licensee'].agg(list))
+    person_counts = pd.concat([facility_counts, business_names], axis=1).reset_index()
     person_counts.columns = ['person_name', 'facility_count', 'business_names']
     person_counts = person_counts[person_counts['facility_count'] >= 3]
     person_counts = person_counts.sort_values('facility_count', ascending=False)
 
     print(f"\nPeople operating 3+ facilities:")
-    for _, row in person_counts.head(20).iterrows():
-        print(f"  {row['person_name']}: {row['facility_count']} facilities")
-
-    # Detect generic/suspicious naming patterns
-    suspicious_patterns = [
-        r'^[A-Z]\s*&\s*[A-Z]\s',  # A & B pattern
-        r'LEARNING CENTER',
-        r'CHILD DEVELOPMENT',
-        r'LITTLE\s*(ONES|ANGELS|STARS|KIDS)',
-        r'^(ABC|123)',
-        r'KIDZ|KIDDS|KIDDZ',
-        r'ACADEMY\s*LLC',
-        r'BRIGHT\s*(START|FUTURE|HORIZON)',
-    ]
+    for row in person_counts.head(20).itertuples(index=False):
+        print(f"  {row.person_name}: {row.facility_count} facilities")
 
-    df['generic_name_flag'] = False
-    for pattern in suspicious_patterns:
-        df['generic_name_flag'] |= df['licensee_clean'].str.contains(pattern, regex=True, na=False)
+    # Detect generic/suspicious naming patterns (one pass with the combined pattern)
+    df['generic_name_flag'] = df['licensee_clean'].str.contains(GENERIC_NAME_RE, na=False)
 
     generic_count = df['generic_name_flag'].sum()
     print(f"\nFacilities with generic/suspicious name patterns: {generic_count}")
@@ -172,7 +222,9 @@ def analyze_licensee_patterns(df):
     # For now, flag LLCs with similar names
 
     # Group licensees by first few words to find variations
-    df['licensee_prefix'] = df['licensee_clean'].str.split().str[:2].str.join(' ')
+    # (first two words pulled out by one regex extract, rejoined with a single space)
+    first_words = df['licensee_clean'].str.extract(LICENSEE_PREFIX_RE)
+    df['licensee_prefix'] = first_words[0] + (' ' + first_words[1]).fillna('')
     prefix_counts = df['licensee_prefix'].value_counts()
     common_prefixes = prefix_counts[prefix_counts >= 5].index
 
@@ -194,10 +246,8 @@ def analyze_geographic_clustering(df):
     print("ANALYSIS 3: GEOGRAPHIC CLUSTERING")
     print("="*60)
 
-    df = df.copy()
-
     # Analyze by ZIP code
-    zip_counts = df.groupby('facility_zip').agg({
+    zip_counts = df.groupby('facility_zip', sort=False, observed=True).agg({
         'facility_name': 'count',
         'facility_capacity': 'sum',
         'county_name': 'first',
@@ -218,15 +268,15 @@ def analyze_geographic_clustering(df):
     print(f"\nZIP codes with unusually high concentrations (>{threshold:.0f}): {len(high_concentration_zips)}")
 
     # Analyze COVID-era facilities by geography
-    df['license_date'] = pd.to_datetime(df['license_first_date'], errors='coerce')
-    df['license_year'] = df['license_date'].dt.year
+    covid_by_zip = df[df['license_year'].isin([2020, 2021, 2022])].groupby('facility_zip', sort=False, observed=True).size()
+    covid_hotspots = covid_by_zip.nlargest(20)
 
-    covid_by_zip = df[df['license_year'].isin([2020, 2021, 2022])].groupby('facility_zip').size()
-    covid_hotspots = covid_by_zip.sort_values(ascending=False).head(20)
+    # City of each ZIP's first facility, looked up once instead of filtering the frame per ZIP
+    zip_to_city = df.drop_duplicates('facility_zip').set_index('facility_zip')['facility_city']
 
     print(f"\nTop ZIP codes for COVID-era (2020-2022) new licenses:")
     for zip_code, count in covid_hotspots.items():
-        city = df[df['facility_zip'] == zip_code]['facility_city'].iloc[0] if len(df[df['facility_zip'] == zip_code]) > 0 else 'Unknown'
+        city = zip_to_city.get(zip_code, 'Unknown')
         print(f"  {zip_code} ({city}): {count} new facilities")
 
     zip_counts.to_csv('fraud_analysis_geographic_clusters.csv', index=False)
@@ -248,23 +298,37 @@ def download_cacfp_data():
     print(f"Downloading CACFP Impact Report...")
 
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        # Stream to disk in chunks rather than buffering the whole file in memory
+        with requests.get(url, timeout=30, stream=True) as response:
+            response.raise_for_status()
 
-        with open('cacfp_impact_report_2023-24.xlsx', 'wb') as f:
-            f.write(response.content)
+            with open('cacfp_impact_report_2023-24.xlsx', 'wb') as f:
+                for chunk in response.iter_content(chunk_size=1 << 16):
+                    f.write(chunk)
 
-        # Try to read the Excel file
+        # Summarize the sheets from the workbook metadata and header rows, without
+        # loading every sheet into a DataFrame
         try:
-            cacfp_df = pd.read_excel('cacfp_impact_report_2023-24.xlsx', sheet_name=None)
-            print(f"Downloaded CACFP data. Sheets: {list(cacfp_df.keys())}")
+            from openpyxl import load_workbook
+
+            workbook = load_workbook('cacfp_impact_report_2023-24.xlsx', read_only=True, data_only=True)
+            cacfp_sheets = {}
+            for sheet_name in workbook.sheetnames:
+                sheet = workbook[sheet_name]
+                header = next(sheet.iter_rows(max_row=1, values_only=True), ())
+                cacfp_sheets[sheet_name] = {
+                    'rows': max((sheet.max_row or 0) - 1, 0),
+                    'columns': list(header),
+                }
+            workbook.close()
+            print(f"Downloaded CACFP data. Sheets: {list(cacfp_sheets.keys())}")
 
             # Print summary of each sheet
-            for sheet_name, sheet_df in cacfp_df.items():
-                print(f"\n  Sheet '{sheet_name}': {len(sheet_df)} rows, {len(sheet_df.columns)} columns")
-                print(f"    Columns: {list(sheet_df.columns)[:5]}...")
+            for sheet_name, sheet_info in cacfp_sheets.items():
+                print(f"\n  Sheet '{sheet_name}': {sheet_info['rows']} rows, {len(sheet_info['columns'])} columns")
+                print(f"    Columns: {sheet_info['columns'][:5]}...")
 
-            return cacfp_df
+            return cacfp_sheets
         except Exception as e:
             print(f"  Could not parse Excel: {e}")
             return None
@@ -282,38 +346,25 @@ def generate_investigation_report(df):
     print("GENERATING PRIORITIZED INVESTIGATION REPORT")
     print("="*60)
 
-    df = df.copy()
-
-    # Calculate composite risk score
-    df['risk_score'] = 0
-
-    # License timing (COVID era)
-    df['license_date'] = pd.to_datetime(df['license_first_date'], errors='coerce')
-    df['license_year'] = df['license_date'].dt.year
-    df.loc[df['license_year'].isin([2020, 2021, 2022]), 'risk_score'] += 2
-
-    # Status (closed/inactive)
-    df.loc[df['facility_status'].str.upper().isin(['CLOSED', 'INACTIVE']), 'risk_score'] += 2
-
-    # Short operation period
-    df['closed_date_parsed'] = pd.to_datetime(df['closed_date'], errors='coerce')
-    df['months_operated'] = ((df['closed_date_parsed'] - df['license_date']).dt.days / 30).round(1)
-    df.loc[(df['months_operated'] > 0) & (df['months_operated'] < 24), 'risk_score'] += 3
+    # Operation period (dates are parsed in load_data)
+    df['months_operated'] = ((df['closed_date_parsed'] - df['license_date']).dt.days.astype('float32') / 30).round(1)
 
-    # Shared phone
-    if 'flag_shared_phone' in df.columns:
-        df.loc[df['flag_shared_phone'] == True, 'risk_score'] += 2
+    # Calculate composite risk score as one weighted sum of the flag arrays
+    no_flag = np.zeros(len(df), dtype=bool)
+    covid_era = df['license_year'].isin([2020, 2021, 2022]).to_numpy()  # COVID-era license
+    closed = df['facility_status'].str.upper().isin(['CLOSED', 'INACTIVE']).to_numpy()
+    short_operation = ((df['months_operated'] > 0) & (df['months_operated'] < 24)).to_numpy()
+    shared_phone = df['flag_shared_phone'].eq(True).to_numpy() if 'flag_shared_phone' in df.columns else no_flag
+    generic_name = df['generic_name_flag'].eq(True).to_numpy() if 'generic_name_flag' in df.columns else no_flag
 
-    # Generic name
-    if 'generic_name_flag' in df.columns:
-        df.loc[df['generic_name_flag'] == True, 'risk_score'] += 1
+    weights = np.array([2, 2, 3, 2, 1], dtype=np.int8)
+    flags = np.column_stack([covid_era, closed, short_operation, shared_phone, generic_name])
+    df['risk_score'] = flags.astype(np.int8) @ weights
 
     # Add Google Maps verification link
-    df['google_maps_url'] = df.apply(
-        lambda row: f"https://www.google.com/maps/search/{quote(str(row['facility_address']) + ', ' + str(row['facility_city']) + ', CA')}"
-        if pd.notna(row['facility_address']) and row['facility_address'] != 'UNAVAILABLE' else '',
-        axis=1
-    )
+    has_address = df['facility_address'].notna() & df['facility_address'].ne('UNAVAILABLE')
+    map_query = df['facility_address'].astype(str) + ', ' + df['facility_city'].astype(str).fillna('') + ', CA'
+    df['google_maps_url'] = ("https://www.google.com/maps/search/" + map_query.map(quote, na_action='ignore')).where(has_address, '')
 
     # Sort by risk score
     high_risk = df[df['risk_score'] >= 5].sort_values('risk_score', ascending=False)
@@ -339,17 +390,17 @@ def generate_investigation_report(df):
     print("TOP 25 FACILITIES FOR IMMEDIATE INVESTIGATION")
     print("="*60)
 
-    for i, (_, row) in enumerate(high_risk.head(25).iterrows(), 1):
-        print(f"\n{i}. {row['facility_name']} (Risk Score: {row['risk_score']})")
-        print(f"   Licensee: {row['licensee']}")
-        print(f"   Address: {row['facility_address']}, {row['facility_city']} {row['facility_zip']}")
-        print(f"   County: {row['county_name']}")
-        print(f"   Status: {row['facility_status']} | Capacity: {row['facility_capacity']}")
-        print(f"   Licensed: {row['license_first_date']} | Closed: {row['closed_date']}")
-        if pd.notna(row.get('months_operated')) and row['months_operated'] > 0:
-            print(f"   Operated: {row['months_operated']} months")
-        print(f"   Phone: {row['facility_telephone_number']}")
-        print(f"   VERIFY: {row['google_maps_url']}")
+    for i, row in enumerate(high_risk.head(25).itertuples(index=False), 1):
+        print(f"\n{i}. {row.facility_name} (Risk Score: {row.risk_score})")
+        print(f"   Licensee: {row.licensee}")
+        print(f"   Address: {row.facility_address}, {row.facility_city} {row.facility_zip}")
+        print(f"   County: {row.county_name}")
+        print(f"   Status: {row.facility_status} | Capacity: {row.facility_capacity}")
+        print(f"   Licensed: {row.license_first_date} | Closed: {row.closed_date}")
+        if pd.notna(getattr(row, 'months_operated', None)) and row.months_operated > 0:
+            print(f"   Operated: {row.months_operated:.1f} months")
+        print(f"   Phone: {row.facility_telephone_number}")
+        print(f"   VERIFY: {row.google_maps_url}")
 
     # Summary statistics
     print(f"\n{'='*60}")
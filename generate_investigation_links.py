@@ -8,51 +8,52 @@ Creates clickable links for:
 4. LinkedIn - Find the licensee/owner
 """
 
+import re
 import pandas as pd
 from urllib.parse import quote
 import webbrowser
 import time
 
-def generate_sos_search_url(business_name):
-    """Generate CA Secretary of State bizfile search URL."""
-    # Clean up the business name for search
-    name = str(business_name).strip()
-    # Remove common suffixes that might cause search issues
-    for suffix in [', INC.', ', INC', ' INC.', ' INC', ' LLC', ', LLC', ' L.L.C.', ' CORP', ' CORPORATION']:
-        name = name.replace(suffix, '')
-    return f"https://bizfileonline.sos.ca.gov/search/business?searchType=Business+Name&searchCriteria={quote(name)}"
+# Business suffixes dropped from SOS search names (one pass, longest forms first)
+SOS_SUFFIX_RE = re.compile(r', INC\.|, INC| INC\.| INC| LLC| L\.L\.C\.| CORP')
 
 
-def generate_ccld_inspection_url(facility_number):
-    """Generate CCLD facility detail page URL for inspection history."""
-    if pd.isna(facility_number):
-        return ''
-    fac_num = str(int(facility_number)) if isinstance(facility_number, float) else str(facility_number)
-    return f"https://www.ccld.dss.ca.gov/carefacilitysearch/FacDetail/{fac_num}"
+def generate_sos_search_url(business_names):
+    """Generate CA Secretary of State bizfile search URLs for a column of business names."""
+    # Clean up the business names for search, removing common suffixes that might cause search issues
+    names = business_names.fillna('').astype(str).str.strip().str.replace(SOS_SUFFIX_RE, '', regex=True)
+    return "https://bizfileonline.sos.ca.gov/search/business?searchType=Business+Name&searchCriteria=" + names.map(quote)
 
 
-def generate_google_news_url(business_name, city):
-    """Generate Google News search URL."""
-    query = f'"{business_name}" {city} California daycare'
-    return f"https://www.google.com/search?q={quote(query)}&tbm=nws"
+def generate_ccld_inspection_url(facility_numbers):
+    """Generate CCLD facility detail page URLs for inspection history ('' where the number is missing)."""
+    if pd.api.types.is_float_dtype(facility_numbers):
+        facility_numbers = facility_numbers.astype('Int64')
+    fac_nums = facility_numbers.astype('string')
+    return ("https://www.ccld.dss.ca.gov/carefacilitysearch/FacDetail/" + fac_nums).fillna('').astype(object)
 
 
-def generate_google_search_url(business_name, licensee):
-    """Generate general Google search URL."""
-    query = f'"{licensee}" OR "{business_name}" California daycare fraud OR investigation OR lawsuit'
-    return f"https://www.google.com/search?q={quote(query)}"
+def generate_google_news_url(business_names, cities):
+    """Generate Google News search URLs."""
+    queries = '"' + business_names.fillna('').astype(str) + '" ' + cities.fillna('').astype(str) + ' California daycare'
+    return "https://www.google.com/search?q=" + queries.map(quote) + "&tbm=nws"
 
 
-def generate_linkedin_url(person_name):
-    """Generate LinkedIn search URL for a person."""
-    # Only use if it looks like a person name (has comma)
-    if ',' in str(person_name):
-        # Convert "LASTNAME, FIRSTNAME" to "Firstname Lastname"
-        parts = person_name.split(',')
-        if len(parts) >= 2:
-            name = f"{parts[1].strip()} {parts[0].strip()}"
-            return f"https://www.linkedin.com/search/results/all/?keywords={quote(name)}"
-    return None
+def generate_google_search_url(business_names, licensees):
+    """Generate general Google search URLs."""
+    queries = ('"' + licensees.fillna('').astype(str) + '" OR "' + business_names.fillna('').astype(str)
+               + '" California daycare fraud OR investigation OR lawsuit')
+    return "https://www.google.com/search?q=" + queries.map(quote)
+
+
+def generate_linkedin_url(person_names):
+    """Generate LinkedIn search URLs for names that look like a person (None otherwise)."""
+    # Only use names with a comma, converting "LASTNAME, FIRSTNAME" to "Firstname Lastname"
+    names = person_names.fillna('').astype(str)
+    parts = names.str.split(',')
+    name = parts.str[1].str.strip() + ' ' + parts.str[0].str.strip()
+    urls = "https://www.linkedin.com/search/results/all/?keywords=" + name.map(quote, na_action='ignore')
+    return urls.where(names.str.contains(',', regex=False), None)
 
 
 def create_investigation_report():
@@ -70,33 +71,31 @@ def create_investigation_report():
     # Try to merge with raw data to get facility numbers if not present
     if 'facility_number' not in df.columns:
         try:
-            raw_centers = pd.read_csv('raw_child_care_centers.csv', low_memory=False)
-            raw_homes = pd.read_csv('raw_family_child_care_homes.csv', low_memory=False)
-            raw_all = pd.concat([raw_centers, raw_homes], ignore_index=True)
-
-            # Merge on facility_name and licensee
-            df = df.merge(
-                raw_all[['facility_name', 'licensee', 'facility_number']],
-                on=['facility_name', 'licensee'],
-                how='left'
-            )
+            # Only the merge keys and the facility number are needed from the raw files
+            merge_keys = ['facility_name', 'licensee']
+            read_kwargs = dict(usecols=merge_keys + ['facility_number'], dtype={'facility_number': 'Int64'})
+            raw_paths = ('raw_child_care_centers.csv', 'raw_family_child_care_homes.csv')
+            try:
+                raw_frames = [pd.read_csv(path, engine='pyarrow', **read_kwargs) for path in raw_paths]
+            except ImportError:
+                raw_frames = [pd.read_csv(path, **read_kwargs) for path in raw_paths]
+            raw_all = pd.concat(raw_frames, ignore_index=True)
+
+            # Look up one facility number per facility_name and licensee
+            facility_numbers = raw_all.drop_duplicates(merge_keys).set_index(merge_keys)['facility_number']
+            df = df.join(facility_numbers, on=merge_keys)
             print(f"  Merged facility numbers for {df['facility_number'].notna().sum()} facilities")
         except Exception as e:
             print(f"  Could not merge facility numbers: {e}")
             df['facility_number'] = None
 
     # Generate all investigation links
-    df['sos_business_search'] = df['licensee'].apply(generate_sos_search_url)
-    df['google_news_search'] = df.apply(
-        lambda r: generate_google_news_url(r['facility_name'], r.get('facility_city', '')),
-        axis=1
-    )
-    df['google_investigation_search'] = df.apply(
-        lambda r: generate_google_search_url(r['facility_name'], r['licensee']),
-        axis=1
-    )
-    df['linkedin_search'] = df['licensee'].apply(generate_linkedin_url)
-    df['ccld_inspection_history'] = df['facility_number'].apply(generate_ccld_inspection_url)
+    df['sos_business_search'] = generate_sos_search_url(df['licensee'])
+    cities = df['facility_city'] if 'facility_city' in df.columns else pd.Series('', index=df.index)
+    df['google_news_search'] = generate_google_news_url(df['facility_name'], cities)
+    df['google_investigation_search'] = generate_google_search_url(df['facility_name'], df['licensee'])
+    df['linkedin_search'] = generate_linkedin_url(df['licensee'])
+    df['ccld_inspection_history'] = generate_ccld_inspection_url(df['facility_number'])
 
     # Save enhanced report
     df.to_csv('INVESTIGATION_WITH_LINKS.csv', index=False)
@@ -162,32 +161,34 @@ def create_investigation_report():
     <div id="facilities">
 """
 
-    for _, row in df.head(200).iterrows():  # Top 200 for HTML report
-        score = int(row.get('risk_score', 0))
+    # Collect the facility cards and join them once at the end
+    parts = [html_report]
+    for row in df.head(200).itertuples(index=False):  # Top 200 for HTML report
+        score = int(getattr(row, 'risk_score', 0))
         score_class = f"score-{min(score, 10)}"
 
-        html_report += f"""
+        parts.append(f"""
         <div class="facility {score_class}" data-score="{score}">
-            <div class="name">{row['facility_name']}</div>
+            <div class="name">{row.facility_name}</div>
             <div class="risk">Risk Score: {score}</div>
-            <div class="detail"><strong>Licensee:</strong> {row['licensee']}</div>
-            <div class="detail"><strong>Address:</strong> {row.get('facility_address', 'N/A')}, {row.get('facility_city', '')}, CA {row.get('facility_zip', '')}</div>
-            <div class="detail"><strong>County:</strong> {row.get('county_name', 'N/A')}</div>
-            <div class="detail"><strong>Status:</strong> {row.get('facility_status', 'N/A')} | <strong>Capacity:</strong> {row.get('facility_capacity', 'N/A')}</div>
-            <div class="detail"><strong>Licensed:</strong> {row.get('license_first_date', 'N/A')} | <strong>Closed:</strong> {row.get('closed_date', 'N/A')}</div>
-            <div class="detail"><strong>Operated:</strong> {row.get('months_operated', 'N/A')} months</div>
-            <div class="detail"><strong>Phone:</strong> {row.get('facility_telephone_number', 'N/A')}</div>
+            <div class="detail"><strong>Licensee:</strong> {row.licensee}</div>
+            <div class="detail"><strong>Address:</strong> {getattr(row, 'facility_address', 'N/A')}, {getattr(row, 'facility_city', '')}, CA {getattr(row, 'facility_zip', '')}</div>
+            <div class="detail"><strong>County:</strong> {getattr(row, 'county_name', 'N/A')}</div>
+            <div class="detail"><strong>Status:</strong> {getattr(row, 'facility_status', 'N/A')} | <strong>Capacity:</strong> {getattr(row, 'facility_capacity', 'N/A')}</div>
+            <div class="detail"><strong>Licensed:</strong> {getattr(row, 'license_first_date', 'N/A')} | <strong>Closed:</strong> {getattr(row, 'closed_date', 'N/A')}</div>
+            <div class="detail"><strong>Operated:</strong> {getattr(row, 'months_operated', 'N/A')} months</div>
+            <div class="detail"><strong>Phone:</strong> {getattr(row, 'facility_telephone_number', 'N/A')}</div>
             <div class="links">
-                <a href="{row.get('google_maps_url', '#')}" target="_blank" class="maps">📍 Google Maps</a>
-                <a href="{row.get('ccld_inspection_history', '#')}" target="_blank" class="sos" style="background:#ff5722;">📋 CCLD Inspections</a>
-                <a href="{row['sos_business_search']}" target="_blank" class="sos">🏛️ CA SOS Business</a>
-                <a href="{row['google_news_search']}" target="_blank" class="news">📰 News Search</a>
-                <a href="{row['google_investigation_search']}" target="_blank" class="google">🔍 Investigation Search</a>
+                <a href="{getattr(row, 'google_maps_url', '#')}" target="_blank" class="maps">📍 Google Maps</a>
+                <a href="{getattr(row, 'ccld_inspection_history', '#')}" target="_blank" class="sos" style="background:#ff5722;">📋 CCLD Inspections</a>
+                <a href="{row.sos_business_search}" target="_blank" class="sos">🏛️ CA SOS Business</a>
+                <a href="{row.google_news_search}" target="_blank" class="news">📰 News Search</a>
+                <a href="{row.google_investigation_search}" target="_blank" class="google">🔍 Investigation Search</a>
             </div>
         </div>
-"""
+""")
 
-    html_report += """
+    parts.append("""
     </div>
 
     <script>
@@ -200,7 +201,8 @@ def create_investigation_report():
     </script>
 </body>
 </html>
-"""
+""")
+    html_report = "".join(parts)
 
     with open('INVESTIGATION_REPORT.html', 'w') as f:
         f.write(html_report)
@@ -219,16 +221,16 @@ def create_investigation_report():
     print("TOP 10 HIGHEST RISK - IMMEDIATE INVESTIGATION NEEDED")
     print('='*60)
 
-    for i, (_, row) in enumerate(df.head(10).iterrows(), 1):
-        print(f"\n{i}. {row['facility_name']}")
-        print(f"   Risk Score: {row['risk_score']}")
-        print(f"   Licensee: {row['licensee']}")
-        print(f"   Location: {row.get('facility_city', 'N/A')}, CA")
+    for i, row in enumerate(df.head(10).itertuples(index=False), 1):
+        print(f"\n{i}. {row.facility_name}")
+        print(f"   Risk Score: {row.risk_score}")
+        print(f"   Licensee: {row.licensee}")
+        print(f"   Location: {getattr(row, 'facility_city', 'N/A')}, CA")
         print(f"   ")
         print(f"   VERIFY LINKS:")
-        print(f"   - Maps: {row.get('google_maps_url', 'N/A')}")
-        print(f"   - SOS: {row['sos_business_search']}")
-        print(f"   - News: {row['google_news_search']}")
+        print(f"   - Maps: {getattr(row, 'google_maps_url', 'N/A')}")
+        print(f"   - SOS: {row.sos_business_search}")
+        print(f"   - News: {row.google_news_search}")
 
 
 def open_top_facilities(n=5):
@@ -241,20 +243,20 @@ def open_top_facilities(n=5):
 
     print(f"Opening investigation links for top {n} facilities...")
 
-    for i, (_, row) in enumerate(df.head(n).iterrows(), 1):
-        print(f"\n{i}. Opening links for: {row['facility_name']}")
+    for i, row in enumerate(df.head(n).itertuples(index=False), 1):
+        print(f"\n{i}. Opening links for: {row.facility_name}")
 
         # Open Google Maps
-        if pd.notna(row.get('google_maps_url')):
-            webbrowser.open(row['google_maps_url'])
+        if pd.notna(getattr(row, 'google_maps_url', None)):
+            webbrowser.open(row.google_maps_url)
             time.sleep(0.5)
 
         # Open SOS search
-        webbrowser.open(row['sos_business_search'])
+        webbrowser.open(row.sos_business_search)
         time.sleep(0.5)
 
         # Open news search
-        webbrowser.open(row['google_news_search'])
+        webbrowser.open(row.google_news_search)
 
         if i < n:
             input(f"\nPress Enter to continue to facility {i+1}...")